@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'core.instrumentation.InstrumentedLocMemCache',
+)
+
+
+@register(Tags.caches)
+def check_page_cache(app_configs, **kwargs):
+    """Метки очистки страниц должны быть видны всем процессам.
+
+    С кешем внутри процесса purge() из runjobs или соседнего воркера
+    не доходит до остальных, и они отдают устаревшие страницы.
+    """
+    default = settings.CACHES['default']
+    backend = default.get('WRAPPED', default['BACKEND'])
+    if getattr(settings, 'PAGE_CACHE_TIMEOUT', 0) and (
+        backend in LOCAL_CACHE_BACKENDS
+    ):
+        return [Error(
+            'PAGE_CACHE_TIMEOUT requires a cache shared between processes.',
+            hint='Point CACHES["default"] at Redis or Memcached, '
+                 'or set PAGE_CACHE_TIMEOUT = 0.',
+            id='core.E001',
+        )]
+    return []
@@ -0,0 +1,124 @@
+"""Обёртки над бэкендами Django и sorl, отдающие метрики."""
+import time
+from functools import lru_cache
+
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.utils.module_loading import import_string
+from sorl.thumbnail.base import ThumbnailBackend
+
+from core import metrics
+
+
+_MISSING = object()
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.observe(
+                'template_render_seconds',
+                time.perf_counter() - start,
+                template=self.origin.template_name
+            )
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Бэкенд шаблонов, замеряющий время рендера каждого шаблона."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(
+            self.engine.from_string(template_code), self
+        )
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class InstrumentedCacheMixin:
+    """Считает попадания и промахи кеша, в том числе внутри get_many."""
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self.metrics_alias = params.get('KEY_PREFIX') or 'default'
+        # Базовый get_many вызывает get и считается там; Redis, Memcached
+        # и БД выбирают ключи сами, их считаем по результату.
+        self.native_get_many = (
+            super(InstrumentedCacheMixin, type(self)).get_many
+            is not BaseCache.get_many
+        )
+
+    def count(self, result, value=1):
+        if value:
+            metrics.inc(
+                'cache_requests_total', value,
+                cache=self.metrics_alias, result=result
+            )
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        hit = value is not _MISSING
+        self.count('hit' if hit else 'miss')
+        return value if hit else default
+
+    def get_many(self, keys, version=None):
+        if not self.native_get_many:
+            return super().get_many(keys, version)
+        keys = list(keys)
+        values = super().get_many(keys, version)
+        self.count('hit', len(values))
+        self.count('miss', len(keys) - len(values))
+        return values
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+@lru_cache(maxsize=None)
+def instrumented_backend(path):
+    backend = import_string(path)
+    name = f'Instrumented{backend.__name__}'
+    return type(name, (InstrumentedCacheMixin, backend), {})
+
+
+class InstrumentedCache:
+    """Обёртка над любым бэкендом кеша из параметра WRAPPED.
+
+    CACHES = {'default': {
+        'BACKEND': 'core.instrumentation.InstrumentedCache',
+        'WRAPPED': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': ...,
+    }}
+    """
+
+    def __new__(cls, location, params):
+        return instrumented_backend(params['WRAPPED'])(location, params)
+
+
+class InstrumentedThumbnailBackend(ThumbnailBackend):
+    """Замеряет время генерации миниатюр sorl-thumbnail."""
+
+    def _create_thumbnail(self, source_image, geometry_string, options,
+                          thumbnail):
+        start = time.perf_counter()
+        try:
+            return super()._create_thumbnail(
+                source_image, geometry_string, options, thumbnail
+            )
+        finally:
+            metrics.observe(
+                'thumbnail_seconds',
+                time.perf_counter() - start,
+                geometry=geometry_string
+            )
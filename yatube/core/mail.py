@@ -0,0 +1,262 @@
+"""Очередь исходящей почты в файлах.
+
+SpoolEmailBackend только сохраняет письмо в MAIL_SPOOL_DIR/new и сразу
+возвращает управление. Команда send_spooled_mail забирает письма пачками
+и отправляет каждую пачку через одно соединение MAIL_SPOOL_BACKEND;
+неудачные попытки откладываются с нарастающей паузой, а после
+MAIL_SPOOL_MAX_ATTEMPTS письмо перекладывается в failed.
+
+Письмо хранится в JSON: готовый MIME-текст и конверт. Никакого pickle,
+чтобы запись в каталог очереди не давала выполнить код в воркере.
+"""
+import base64
+import email
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+from email.generator import BytesGenerator
+from io import BytesIO
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE: int = 100
+MAX_ATTEMPTS: int = 5
+RETRY_BASE: int = 30
+RETRY_MAX: int = 60 * 60
+CLAIM_TIMEOUT: int = 15 * 60
+STAMP_WIDTH: int = 16
+
+sequence = itertools.count()
+
+
+def spool_dir(*parts):
+    return os.path.join(settings.MAIL_SPOOL_DIR, *parts)
+
+
+def stamp(moment):
+    return f'{int(moment * 1000):0{STAMP_WIDTH}d}'
+
+
+def write_entry(directory, entry, not_before):
+    """Атомарно кладёт письмо в каталог.
+
+    Имя начинается с момента, раньше которого письмо не отправляется,
+    и номера в процессе, поэтому сортировка имён даёт порядок отправки.
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = f'{stamp(not_before)}-{next(sequence):010d}-{uuid.uuid4().hex}.msg'
+    temp_path = os.path.join(directory, f'.{name}.tmp')
+    with open(temp_path, 'w') as spool_file:
+        json.dump(entry, spool_file)
+        spool_file.flush()
+        os.fsync(spool_file.fileno())
+    os.replace(temp_path, os.path.join(directory, name))
+    return name
+
+
+class RawMessage(email.message.Message):
+    """MIME-сообщение из очереди с as_bytes(linesep=...), как у Django."""
+
+    def as_bytes(self, unixfrom=False, linesep='\n'):
+        output = BytesIO()
+        generator = BytesGenerator(output, mangle_from_=False)
+        generator.flatten(self, unixfrom=unixfrom, linesep=linesep)
+        return output.getvalue()
+
+
+class SpooledMessage(EmailMessage):
+    """Письмо, восстановленное из очереди: конверт и готовый MIME-текст."""
+
+    def __init__(self, raw, from_email, recipients, subject=''):
+        super().__init__(subject=subject, from_email=from_email)
+        self.raw = raw
+        self.envelope_recipients = recipients
+
+    def recipients(self):
+        return self.envelope_recipients
+
+    def message(self):
+        return email.message_from_bytes(self.raw, _class=RawMessage)
+
+
+def to_entry(message):
+    return {
+        'from_email': message.from_email,
+        'recipients': message.recipients(),
+        'subject': message.subject,
+        'raw': base64.b64encode(message.message().as_bytes()).decode(),
+        'attempts': 0,
+    }
+
+
+def to_message(entry):
+    return SpooledMessage(
+        base64.b64decode(entry['raw'], validate=True),
+        entry['from_email'],
+        list(entry['recipients']),
+        entry.get('subject', ''),
+    )
+
+
+class SpoolEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        now = time.time()
+        spooled = 0
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            try:
+                write_entry(spool_dir('new'), to_entry(message), now)
+            except OSError:
+                if not self.fail_silently:
+                    raise
+                continue
+            spooled += 1
+        return spooled
+
+
+def claim(limit):
+    """Переносит готовые письма в work; rename атомарен,
+    так что несколько воркеров не возьмут одно письмо."""
+    work = spool_dir('work')
+    os.makedirs(work, exist_ok=True)
+    try:
+        names = sorted(
+            name for name in os.listdir(spool_dir('new'))
+            if name.endswith('.msg')
+        )
+    except FileNotFoundError:
+        return []
+    now = stamp(time.time())
+    claimed = []
+    for name in names:
+        if len(claimed) >= limit or name[:STAMP_WIDTH] > now:
+            break
+        path = os.path.join(work, name)
+        try:
+            os.rename(spool_dir('new', name), path)
+        except FileNotFoundError:
+            continue
+        os.utime(path)
+        claimed.append(path)
+    return claimed
+
+
+def requeue_stale(timeout=CLAIM_TIMEOUT):
+    """Возвращает письма, застрявшие у упавшего воркера."""
+    try:
+        names = os.listdir(spool_dir('work'))
+    except FileNotFoundError:
+        return 0
+    stale = time.time() - timeout
+    requeued = 0
+    for name in names:
+        path = spool_dir('work', name)
+        try:
+            if os.path.getmtime(path) < stale:
+                os.rename(path, spool_dir('new', name))
+                requeued += 1
+        except FileNotFoundError:
+            continue
+    return requeued
+
+
+def retry_delay(attempts):
+    return min(RETRY_BASE * 2 ** (attempts - 1), RETRY_MAX)
+
+
+def reschedule(path, entry, error):
+    entry['attempts'] += 1
+    entry['error'] = repr(error)
+    max_attempts = getattr(settings, 'MAIL_SPOOL_MAX_ATTEMPTS', MAX_ATTEMPTS)
+    if entry['attempts'] >= max_attempts:
+        logger.error('Письмо не отправлено: %s', entry['error'])
+        write_entry(spool_dir('failed'), entry, time.time())
+    else:
+        write_entry(
+            spool_dir('new'), entry,
+            time.time() + retry_delay(entry['attempts'])
+        )
+    os.remove(path)
+
+
+def load(path):
+    """Письмо из файла очереди: (запись, EmailMessage)."""
+    with open(path) as spool_file:
+        entry = json.load(spool_file)
+    return entry, to_message(entry)
+
+
+def quarantine(path, error):
+    """Битый или недописанный файл уходит в failed, не ломая пачку."""
+    logger.error('Нечитаемое письмо %s: %r', path, error)
+    os.makedirs(spool_dir('failed'), exist_ok=True)
+    os.replace(path, spool_dir('failed', os.path.basename(path)))
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def load_batch(batch_size):
+    entries = []
+    for path in claim(batch_size):
+        try:
+            entries.append((path, *load(path)))
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            quarantine(path, error)
+    return entries
+
+
+def open_connection(pending):
+    """Открывает соединение; если не вышло, откладывает pending."""
+    connection = get_connection(settings.MAIL_SPOOL_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        for path, entry, _ in pending:
+            reschedule(path, entry, error)
+        return None
+    return connection
+
+
+def deliver(batch_size=BATCH_SIZE):
+    """Отправляет одну пачку писем через одно соединение.
+
+    После ошибки отправки соединение открывается заново: оборванное
+    посреди пачки SMTP-соединение не губит остальные письма.
+    Возвращает пару (отправлено, отложено).
+    """
+    entries = load_batch(batch_size)
+    sent = 0
+    connection = None
+    try:
+        for index, (path, entry, message) in enumerate(entries):
+            if connection is None:
+                connection = open_connection(entries[index:])
+                if connection is None:
+                    break
+            try:
+                connection.send_messages([message])
+            except Exception as error:
+                reschedule(path, entry, error)
+                close_quietly(connection)
+                connection = None
+            else:
+                os.remove(path)
+                sent += 1
+    finally:
+        if connection is not None:
+            close_quietly(connection)
+    return sent, len(entries) - sent
@@ -0,0 +1,288 @@
+import random
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY, get_user_model)
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from posts.models import Group, Post
+
+
+User = get_user_model()
+
+SAMPLE_SIZE: int = 1000
+USERNAME_PREFIX: str = 'loadtest_'
+
+# (имя URL, вес, нужен ли вход, пишет ли в базу)
+ACTIONS = (
+    ('posts:index', 30, False, False),
+    ('posts:group_list', 10, False, False),
+    ('posts:profile', 15, False, False),
+    ('posts:post_detail', 20, False, False),
+    ('posts:follow_index', 8, True, False),
+    ('posts:add_comment', 4, True, True),
+    ('posts:profile_follow', 3, True, True),
+    ('posts:post_create', 2, True, True),
+)
+
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+class VirtualUser:
+    """Пользователь сайта со своими cookie, гоняющий WSGI-приложение."""
+
+    def __init__(self, command, user=None):
+        self.command = command
+        self.user = user
+        self.csrf = get_random_string(32)
+        self.cookies = {settings.CSRF_COOKIE_NAME: self.csrf}
+        if user is not None:
+            self.cookies[settings.SESSION_COOKIE_NAME] = self.login(user)
+
+    def login(self, user):
+        engine = import_module(settings.SESSION_ENGINE)
+        session = engine.SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return session.session_key
+
+    def environ(self, method, path, query=None, data=None):
+        body = urlencode(data or {}).encode()
+        return {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': urlencode(query or {}),
+            'SERVER_NAME': self.command.host,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': self.command.host,
+            'HTTP_COOKIE': '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            ),
+            'HTTP_X_CSRFTOKEN': self.csrf,
+            'REMOTE_ADDR': '127.0.0.1',
+            'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+
+    def request(self, method, path, query=None, data=None):
+        status = []
+
+        def start_response(status_line, headers, exc_info=None):
+            status.append(int(status_line.split()[0]))
+
+        result = self.command.application(
+            self.environ(method, path, query, data), start_response
+        )
+        try:
+            for _ in result:
+                pass
+        finally:
+            close = getattr(result, 'close', None)
+            if close is not None:
+                close()
+        return status[0]
+
+    def step(self):
+        name, method, path, query, data = self.command.pick(self)
+        start = time.perf_counter()
+        try:
+            status = self.request(method, path, query, data)
+            failed = status >= 400
+        except Exception:
+            failed = True
+        self.command.record(name, time.perf_counter() - start, failed)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон сайта: смесь анонимных и вошедших '
+        'пользователей вызывает WSGI-приложение напрямую из пула потоков. '
+        'Действия с записью создают комментарии, посты и подписки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument(
+            '--logged-in', type=float, default=0.5,
+            help='Доля вошедших пользователей.'
+        )
+        parser.add_argument('--duration', type=float, default=30.0)
+        parser.add_argument(
+            '--read-only', action='store_true',
+            help='Не выполнять действия, пишущие в базу.'
+        )
+        parser.add_argument('--host', default=None)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+        self.host = options['host'] or self.default_host()
+        self.application = WSGIHandler()
+        self.lock = threading.Lock()
+        self.results = {}
+        self.load_samples()
+        actions = [
+            action for action in ACTIONS
+            if not (options['read_only'] and action[3])
+        ]
+        self.anonymous_actions = [a for a in actions if not a[2]]
+        self.user_actions = actions
+        logged_in = int(options['users'] * options['logged_in'])
+        users = [
+            VirtualUser(self, user)
+            for user in self.load_users(logged_in)
+        ] + [
+            VirtualUser(self) for _ in range(options['users'] - logged_in)
+        ]
+        deadline = time.monotonic() + options['duration']
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(users)) as pool:
+            futures = [
+                pool.submit(self.run_user, user, deadline) for user in users
+            ]
+        self.report(time.monotonic() - started)
+        crashed = [
+            future.exception() for future in futures
+            if future.exception() is not None
+        ]
+        if crashed:
+            for error in crashed:
+                self.stderr.write(''.join(traceback.format_exception(error)))
+            raise CommandError(
+                f'Упало виртуальных пользователей: '
+                f'{len(crashed)} из {len(users)}, отчёт неполный.'
+            )
+
+    def default_host(self):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+        if 'testserver' in hosts or not hosts:
+            return 'testserver'
+        return hosts[0].lstrip('.')
+
+    def load_samples(self):
+        self.post_ids = list(
+            Post.objects.order_by('-pk').values_list('pk', flat=True)[
+                :SAMPLE_SIZE]
+        )
+        self.usernames = list(
+            User.objects.filter(posts__isnull=False).distinct().values_list(
+                'username', flat=True)[:SAMPLE_SIZE]
+        )
+        self.group_slugs = list(
+            Group.objects.values_list('slug', flat=True)[:SAMPLE_SIZE]
+        )
+        if not self.post_ids:
+            raise CommandError('В базе нет постов для прогона.')
+
+    def load_users(self, count):
+        users = []
+        for index in range(count):
+            user, created = User.objects.get_or_create(
+                username=f'{USERNAME_PREFIX}{index}'
+            )
+            if created:
+                user.set_unusable_password()
+                user.save()
+            users.append(user)
+        return users
+
+    def pick(self, virtual_user):
+        actions = (
+            self.user_actions if virtual_user.user
+            else self.anonymous_actions
+        )
+        name = random.choices(
+            [action[0] for action in actions],
+            weights=[action[1] for action in actions]
+        )[0]
+        if name == 'posts:index':
+            page = random.choice([None, None, None, 2, 3, 10])
+            return name, 'GET', reverse(name), page and {'page': page}, None
+        if name == 'posts:group_list' and self.group_slugs:
+            slug = random.choice(self.group_slugs)
+            return name, 'GET', reverse(name, args=[slug]), None, None
+        profile_actions = ('posts:profile', 'posts:profile_follow')
+        if name in profile_actions and self.usernames:
+            username = random.choice(self.usernames)
+            return name, 'GET', reverse(name, args=[username]), None, None
+        if name == 'posts:add_comment':
+            post_id = random.choice(self.post_ids)
+            return name, 'POST', reverse(name, args=[post_id]), None, {
+                'text': f'Нагрузочный комментарий {random.random()}'
+            }
+        if name == 'posts:post_create':
+            return name, 'POST', reverse(name), None, {
+                'text': f'Нагрузочный пост {random.random()}'
+            }
+        if name == 'posts:follow_index':
+            return name, 'GET', reverse(name), None, None
+        post_id = random.choice(self.post_ids)
+        return (
+            'posts:post_detail', 'GET',
+            reverse('posts:post_detail', args=[post_id]), None, None
+        )
+
+    def run_user(self, virtual_user, deadline):
+        try:
+            while time.monotonic() < deadline:
+                close_old_connections()
+                virtual_user.step()
+        finally:
+            connection.close()
+
+    def record(self, name, duration, failed):
+        with self.lock:
+            result = self.results.setdefault(
+                name, {'durations': [], 'errors': 0}
+            )
+            result['durations'].append(duration)
+            result['errors'] += failed
+
+    def report(self, elapsed):
+        total = sum(len(r['durations']) for r in self.results.values())
+        self.stdout.write(
+            f'{"URL":<24}{"запросов":>10}{"rps":>9}{"ошибок":>9}'
+            f'{"p50 мс":>9}{"p95 мс":>9}{"p99 мс":>9}{"max мс":>9}'
+        )
+        for name, result in sorted(self.results.items()):
+            durations = sorted(result['durations'])
+            count = len(durations)
+            self.stdout.write(
+                f'{name:<24}{count:>10}{count / elapsed:>9.1f}'
+                f'{result["errors"] / count:>9.1%}'
+                f'{percentile(durations, 0.5) * 1000:>9.1f}'
+                f'{percentile(durations, 0.95) * 1000:>9.1f}'
+                f'{percentile(durations, 0.99) * 1000:>9.1f}'
+                f'{durations[-1] * 1000:>9.1f}'
+            )
+        self.stdout.write(
+            f'Всего: {total} запросов за {elapsed:.1f} с, '
+            f'{total / elapsed:.1f} rps'
+        )
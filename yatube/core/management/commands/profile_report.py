@@ -0,0 +1,68 @@
+import glob
+import io
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import (collapsed_stacks, load_stats, make_token,
+                            profile_dir)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводит профили SamplingProfilerMiddleware: топ горячих функций '
+        'и свёрнутые стеки для flame graph.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'views', nargs='*',
+            help='Имена URL, например posts:index. По умолчанию все.'
+        )
+        parser.add_argument('--top', type=int, default=25)
+        parser.add_argument(
+            '--sort', default='cumulative',
+            help='Ключ сортировки pstats: cumulative, tottime, calls.'
+        )
+        parser.add_argument(
+            '--collapsed-dir',
+            help='Куда записать <view>.collapsed для flamegraph.pl.'
+        )
+        parser.add_argument(
+            '--make-token', action='store_true',
+            help='Вывести токен для заголовка X-Profile и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        if options['make_token']:
+            self.stdout.write(make_token())
+            return
+        root = profile_dir()
+        views = [name.replace(':', '.') for name in options['views']]
+        if not views:
+            views = sorted(
+                name for name in os.listdir(root)
+                if os.path.isdir(os.path.join(root, name))
+            ) if os.path.isdir(root) else []
+        if not views:
+            raise CommandError(f'В {root} нет профилей.')
+        for view in views:
+            paths = sorted(glob.glob(os.path.join(root, view, '*.prof')))
+            if not paths:
+                self.stderr.write(f'{view}: профилей нет')
+                continue
+            self.report(view, paths, options)
+
+    def report(self, view, paths, options):
+        stats = load_stats(paths)
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(options['sort']).print_stats(options['top'])
+        self.stdout.write(f'=== {view}: профилей {len(paths)}')
+        self.stdout.write(stream.getvalue())
+        if options['collapsed_dir']:
+            os.makedirs(options['collapsed_dir'], exist_ok=True)
+            path = os.path.join(options['collapsed_dir'], f'{view}.collapsed')
+            with open(path, 'w') as output:
+                output.write('\n'.join(collapsed_stacks(stats)) + '\n')
+            self.stdout.write(f'Свёрнутые стеки: {path}')
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import BATCH_SIZE, deliver, requeue_stale
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди MAIL_SPOOL_DIR.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--poll-interval', type=float, default=5.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выйти, как только очередь опустеет.'
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_deferred = 0
+        try:
+            while True:
+                requeue_stale()
+                sent, deferred = deliver(options['batch_size'])
+                total_sent += sent
+                total_deferred += deferred
+                if sent + deferred == 0:
+                    if options['burst']:
+                        break
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(
+            f'Отправлено писем: {total_sent}, отложено: {total_deferred}'
+        )
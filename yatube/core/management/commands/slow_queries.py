@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.slowlog import read_entries
+
+
+class Command(BaseCommand):
+    help = 'Сводка журнала медленных запросов по отпечаткам SQL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--view', help='Только запросы этого URL.')
+        parser.add_argument(
+            '--order', choices=('total', 'max', 'count'), default='total'
+        )
+        parser.add_argument('--log', default=settings.SLOW_QUERY_LOG)
+
+    def handle(self, *args, **options):
+        groups = {}
+        for entry in read_entries(options['log']):
+            if options['view'] and entry.get('view') != options['view']:
+                continue
+            group = groups.setdefault(entry['fingerprint'], {
+                'sql': entry['sql'],
+                'durations': [],
+                'views': {},
+            })
+            group['durations'].append(entry['duration_ms'])
+            view = entry.get('view', '-')
+            group['views'][view] = group['views'].get(view, 0) + 1
+        for group in groups.values():
+            durations = sorted(group['durations'])
+            group['count'] = len(durations)
+            group['total'] = sum(durations)
+            group['max'] = durations[-1]
+            group['p95'] = durations[int(0.95 * (len(durations) - 1))]
+        worst = sorted(
+            groups.items(), key=lambda item: item[1][options['order']],
+            reverse=True
+        )[:options['top']]
+        if not worst:
+            self.stdout.write('Медленных запросов нет.')
+        for fingerprint, group in worst:
+            views = ', '.join(
+                f'{view} ({count})' for view, count in sorted(
+                    group['views'].items(), key=lambda item: -item[1]
+                )
+            )
+            self.stdout.write(
+                f'{fingerprint}  всего {group["total"]:.1f} мс, '
+                f'{group["count"]} раз, p95 {group["p95"]:.1f} мс, '
+                f'макс {group["max"]:.1f} мс\n'
+                f'  {views}\n'
+                f'  {group["sql"]}\n'
+            )
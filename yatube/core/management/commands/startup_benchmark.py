@@ -0,0 +1,91 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+PROFILES = ('dev', 'test', 'prod')
+
+CHILD_SCRIPT = '''
+import json
+import time
+
+started = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+configured = time.perf_counter()
+django.setup()
+ready = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+routed = time.perf_counter()
+print(json.dumps({
+    'settings': configured - started,
+    'setup': ready - configured,
+    'urls': routed - ready,
+}))
+'''
+
+# Значения-заглушки, без которых prod-профиль не загрузится.
+PROD_PLACEHOLDERS = {
+    'SECRET_KEY': 'startup-benchmark',
+    'ALLOWED_HOSTS': 'localhost',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет холодный старт для профилей настроек: импорт настроек, '
+        'django.setup() и загрузку URLconf в отдельных процессах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('profiles', nargs='*', default=PROFILES)
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"профиль":<8}{"настройки":>12}{"setup()":>12}'
+            f'{"URLconf":>12}{"процесс":>12}  (медиана, мс)'
+        )
+        for profile in options['profiles']:
+            if profile not in PROFILES:
+                raise CommandError(f'Неизвестный профиль: {profile}')
+            runs = [self.measure(profile) for _ in range(options['runs'])]
+            median = {
+                key: statistics.median(run[key] for run in runs) * 1000
+                for key in runs[0]
+            }
+            self.stdout.write(
+                f'{profile:<8}{median["settings"]:>12.1f}'
+                f'{median["setup"]:>12.1f}{median["urls"]:>12.1f}'
+                f'{median["process"]:>12.1f}'
+            )
+
+    def measure(self, profile):
+        env = dict(os.environ)
+        if profile == 'prod':
+            for key, value in PROD_PLACEHOLDERS.items():
+                env.setdefault(key, value)
+        env['DJANGO_ENV'] = profile
+        env['DJANGO_SETTINGS_MODULE'] = 'yatube.settings'
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', CHILD_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode:
+            raise CommandError(f'{profile}: {result.stderr.strip()}')
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        timings['process'] = elapsed
+        return timings
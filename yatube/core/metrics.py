@@ -0,0 +1,229 @@
+"""Реестр метрик процесса в формате Prometheus.
+
+На горячем пути метрики пишутся в словари текущего потока без
+блокировок; при выгрузке словари всех потоков суммируются, а словари
+завершившихся потоков сливаются в один общий. Процессы сбрасывают свои
+снимки в METRICS_DIR, а эндпоинт складывает их; файлы завершившихся
+процессов удаляются.
+"""
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+PREFIX: str = 'yatube_'
+
+_local = threading.local()
+_stores = []
+_stores_lock = threading.Lock()
+_retired = {'counters': {}, 'histograms': {}}
+_last_flush = 0.0
+
+
+def _store():
+    store = getattr(_local, 'store', None)
+    if store is None:
+        store = {'counters': {}, 'histograms': {}}
+        _local.store = store
+        with _stores_lock:
+            _stores.append((threading.current_thread(), store))
+    return store
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    counters = _store()['counters']
+    key = _key(name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    histograms = _store()['histograms']
+    key = _key(name, labels)
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = [0] * len(LATENCY_BUCKETS) + [0, 0.0]
+    for index, bound in enumerate(LATENCY_BUCKETS):
+        if value <= bound:
+            histogram[index] += 1
+            break
+    histogram[-2] += 1
+    histogram[-1] += value
+
+
+def _merge(target, source):
+    for key, value in source['counters'].items():
+        target['counters'][key] = target['counters'].get(key, 0) + value
+    for key, values in source['histograms'].items():
+        merged = target['histograms'].get(key)
+        if merged is None:
+            target['histograms'][key] = list(values)
+        else:
+            for index, value in enumerate(values):
+                merged[index] += value
+
+
+def _retire_dead_threads():
+    """Сливает словари завершившихся потоков в _retired.
+
+    Счётчики остаются монотонными, а список словарей не растёт
+    при сервере с потоком на запрос. Вызывается под _stores_lock.
+    """
+    alive = []
+    for thread, store in _stores:
+        if thread.is_alive():
+            alive.append((thread, store))
+        else:
+            _merge(_retired, store)
+    _stores[:] = alive
+
+
+def snapshot():
+    """Сумма метрик всех потоков текущего процесса."""
+    result = {'counters': {}, 'histograms': {}}
+    with _stores_lock:
+        _retire_dead_threads()
+        _merge(result, _retired)
+        stores = [store for _, store in _stores]
+    for store in stores:
+        _merge(result, {
+            'counters': dict(store['counters']),
+            'histograms': {
+                key: list(value)
+                for key, value in list(store['histograms'].items())
+            },
+        })
+    return result
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None)
+
+
+def _encode(data):
+    return {
+        kind: [[name, list(labels), value]
+               for (name, labels), value in items.items()]
+        for kind, items in data.items()
+    }
+
+
+def _decode(data):
+    return {
+        kind: {(name, tuple(tuple(label) for label in labels)): value
+               for name, labels, value in items}
+        for kind, items in data.items()
+    }
+
+
+def flush(force=False):
+    """Сбрасывает снимок процесса в METRICS_DIR не чаще раза в интервал."""
+    global _last_flush
+    directory = metrics_dir()
+    now = time.monotonic()
+    interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 10)
+    if not directory or (not force and now - _last_flush < interval):
+        return
+    _last_flush = now
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{os.getpid()}.json')
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w') as output:
+        json.dump(_encode(snapshot()), output)
+    os.replace(temp_path, path)
+
+
+def process_alive(pid):
+    """Жив ли процесс; METRICS_DIR рассчитан на один хост."""
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect():
+    """Метрики всех процессов: свежий снимок своего и файлы остальных.
+
+    Файлы завершившихся процессов удаляются, а не суммируются вечно.
+    """
+    result = snapshot()
+    directory = metrics_dir()
+    if not directory or not os.path.isdir(directory):
+        return result
+    own = f'{os.getpid()}.json'
+    for filename in os.listdir(directory):
+        if not filename.endswith('.json') or filename == own:
+            continue
+        path = os.path.join(directory, filename)
+        pid = filename[:-len('.json')]
+        if not pid.isdigit() or not process_alive(int(pid)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as source:
+                _merge(result, _decode(json.load(source)))
+        except (OSError, ValueError):
+            continue
+    return result
+
+
+def _labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+        )
+        for name, value in items
+    )
+    return '{' + body + '}'
+
+
+def render(data):
+    """Текстовый формат экспозиции Prometheus."""
+    lines = []
+    typed = set()
+    for (name, labels), value in sorted(data['counters'].items()):
+        metric = f'{PREFIX}{name}'
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f'# TYPE {metric} counter')
+        lines.append(f'{metric}{_labels(labels)} {value}')
+    for (name, labels), values in sorted(data['histograms'].items()):
+        metric = f'{PREFIX}{name}'
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f'# TYPE {metric} histogram')
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, values):
+            cumulative += count
+            lines.append(
+                f'{metric}_bucket{_labels(labels, [("le", bound)])} '
+                f'{cumulative}'
+            )
+        lines.append(
+            f'{metric}_bucket{_labels(labels, [("le", "+Inf")])} '
+            f'{values[-2]}'
+        )
+        lines.append(f'{metric}_sum{_labels(labels)} {values[-1]}')
+        lines.append(f'{metric}_count{_labels(labels)} {values[-2]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,138 @@
+import cProfile
+import os
+import random
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from core import metrics, pagecache, slowlog
+from core.profiling import check_token, profile_dir
+
+
+class SamplingProfilerMiddleware:
+    """Профилирует долю запросов или запросы с подписанным X-Profile.
+
+    Профили складываются в PROFILER_DIR по имени URL,
+    сводятся командой profile_report.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0)
+        self.directory = profile_dir()
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        response = profiler.runcall(self.get_response, request)
+        self.save(request, profiler)
+        return response
+
+    def should_profile(self, request):
+        token = request.META.get('HTTP_X_PROFILE')
+        if token:
+            return check_token(token)
+        return self.rate > 0 and random.random() < self.rate
+
+    def save(self, request, profiler):
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        directory = os.path.join(self.directory, view_name.replace(':', '.'))
+        os.makedirs(directory, exist_ok=True)
+        filename = f'{time.time_ns()}-{os.getpid()}.prof'
+        profiler.dump_stats(os.path.join(directory, filename))
+
+
+class QueryCounter:
+    """execute_wrapper, считающий число и время SQL-запросов."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """Собирает задержку, число и время SQL-запросов по имени URL."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        queries = QueryCounter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.observe(
+            'http_request_duration_seconds',
+            time.perf_counter() - start,
+            view=view
+        )
+        metrics.inc(
+            'http_requests_total',
+            view=view,
+            method=request.method,
+            status=response.status_code
+        )
+        metrics.inc('db_queries_total', queries.count, view=view)
+        metrics.inc('db_query_seconds_total', queries.duration, view=view)
+        metrics.flush()
+        return response
+
+
+class SlowQueryMiddleware:
+    """Относит медленные запросы к имени URL текущего представления."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with slowlog.attribute(request.path):
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        slowlog.current_view.set(request.resolver_match.view_name)
+
+
+class PageCacheMiddleware:
+    """Отдаёт страницы из кеша и заполняет в них персональные дырки.
+
+    Кешируются только ответы, помеченные суррогатными ключами; общая
+    часть страницы одна для всех посетителей. Стоит после
+    AuthenticationMiddleware: дыркам нужны пользователь и CSRF.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cacheable = pagecache.is_cacheable_request(request)
+        if cacheable:
+            response = pagecache.lookup(request)
+            if response is not None:
+                metrics.inc('page_cache_total', result='hit')
+                response['X-Page-Cache'] = 'hit'
+                return pagecache.fill_response(request, response)
+        rendered_at = time.time()
+        response = self.get_response(request)
+        if (
+            cacheable
+            and request.method == 'GET'
+            and pagecache.is_cacheable_response(response)
+        ):
+            metrics.inc('page_cache_total', result='miss')
+            pagecache.store(
+                request, response, rendered_at, settings.PAGE_CACHE_TIMEOUT
+            )
+        return pagecache.fill_response(request, response)
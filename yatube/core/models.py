@@ -4,8 +4,23 @@ from django.db import models
 class CreatedModel(models.Model):
     pub_date = models.DateTimeField(
         'Дата создания',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
     )
 
     class Meta:
         abstract = True
+
+
+class MediaBlob(models.Model):
+    name = models.CharField('Имя файла', max_length=255, primary_key=True)
+    refcount = models.PositiveIntegerField('Число ссылок', default=0)
+    size = models.PositiveBigIntegerField('Размер', default=0)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+
+    def __str__(self):
+        return f'{self.name} ({self.refcount})'
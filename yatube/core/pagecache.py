@@ -0,0 +1,157 @@
+"""Кеш целых страниц с очисткой по суррогатным ключам и «дырками».
+
+Представление помечает ответ ключами вроде 'post:1' или 'group:2'
+(tag_response). Для каждого ключа в кеше хранится время последней
+очистки; страница считается свежей, пока все её ключи не очищались
+после того, как она была отрисована. purge() поэтому стоит одну запись
+в кеш на ключ и не требует знать, какие страницы его используют.
+
+Персональные части страницы (шапка, кнопка подписки, формы с CSRF)
+выводятся тегом {% hole %} как маркеры. В кеш попадает общая для всех
+страница с маркерами, а fill_holes() для каждого запроса отрисовывает
+только эти небольшие шаблоны, поэтому кеш работает и для вошедших
+пользователей. Маркер подписан SECRET_KEY: шаблон и контекст из
+маркера, который пришёл не из {% hole %}, а, например, из текста
+пользователя, не отрисовываются.
+"""
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.http import quote_etag
+
+
+HEADER = 'Surrogate-Key'
+ENTRY_PREFIX = 'pagecache:page:'
+STAMP_PREFIX = 'pagecache:key:'
+HOLE_PATTERN = re.compile(rb'<!--hole:([A-Za-z0-9_=:.-]+)-->')
+HOLE_SALT = 'core.pagecache.hole'
+
+
+def hole_marker(template_name, context):
+    payload = signing.dumps([template_name, context], salt=HOLE_SALT)
+    return f'<!--hole:{payload}-->'
+
+
+def fill_holes(request, content):
+    """Заменяет маркеры на шаблоны, отрисованные для этого запроса."""
+    rendered = {}
+
+    def render_hole(match):
+        marker = match.group(1)
+        if marker not in rendered:
+            try:
+                template_name, context = signing.loads(
+                    marker.decode(), salt=HOLE_SALT
+                )
+            except signing.BadSignature:
+                rendered[marker] = b''
+            else:
+                rendered[marker] = render_to_string(
+                    template_name, context, request=request
+                ).encode()
+        return rendered[marker]
+
+    return HOLE_PATTERN.sub(render_hole, content)
+
+
+def fill_response(request, response):
+    if (
+        not response.streaming
+        and response.get('Content-Type', '').startswith('text/html')
+        and b'<!--hole:' in response.content
+    ):
+        response.content = fill_holes(request, response.content)
+    return response
+
+
+def tag_response(response, *keys):
+    """Помечает ответ суррогатными ключами."""
+    keys = set(keys)
+    keys.update(response.get(HEADER, '').split())
+    response[HEADER] = ' '.join(sorted(keys))
+    return response
+
+
+def post_keys(posts):
+    return [f'post:{post.pk}' for post in posts]
+
+
+def stamp_key(key):
+    return STAMP_PREFIX + key
+
+
+def purge(*keys):
+    """Делает устаревшими все страницы с любым из ключей."""
+    now = time.time()
+    cache.set_many({stamp_key(key): now for key in keys}, None)
+
+
+def page_key(request):
+    path = request.get_full_path().encode()
+    return ENTRY_PREFIX + hashlib.md5(path).hexdigest()
+
+
+def is_fresh(keys, rendered_at):
+    stamps = cache.get_many([stamp_key(key) for key in keys])
+    if len(stamps) < len(keys):
+        return False
+    return all(stamp < rendered_at for stamp in stamps.values())
+
+
+def lookup(request):
+    entry = cache.get(page_key(request))
+    if entry is None or not is_fresh(entry['keys'], entry['rendered_at']):
+        return None
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers']:
+        response[header] = value
+    if entry.get('etag'):
+        response['ETag'] = entry['etag']
+    return response
+
+
+def store(request, response, rendered_at, timeout):
+    keys = response[HEADER].split()
+    stamps = cache.get_many([stamp_key(key) for key in keys])
+    if any(stamp >= rendered_at for stamp in stamps.values()):
+        return
+    for key in keys:
+        if stamp_key(key) not in stamps:
+            cache.add(stamp_key(key), 0.0, None)
+    content = response.content
+    etag = None
+    if b'<!--hole:' not in content:
+        etag = quote_etag(hashlib.md5(content).hexdigest())
+    cache.set(page_key(request), {
+        'keys': keys,
+        'rendered_at': rendered_at,
+        'status': response.status_code,
+        'headers': [
+            (header, value) for header, value in response.items()
+            if header.lower() not in ('vary', 'set-cookie')
+        ],
+        'content': content,
+        'etag': etag,
+    }, timeout)
+
+
+def is_cacheable_request(request):
+    return (
+        getattr(settings, 'PAGE_CACHE_TIMEOUT', 0) > 0
+        and request.method in ('GET', 'HEAD')
+    )
+
+
+def is_cacheable_response(response):
+    return (
+        response.status_code == 200
+        and HEADER in response
+        and not response.cookies
+        and not response.streaming
+    )
@@ -0,0 +1,54 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+ESTIMATE_THRESHOLD: int = 10000
+
+
+def table_estimate(model, using='default'):
+    """Оценка числа строк таблицы по статистике СУБД.
+
+    Возвращает None, если СУБД такой оценки не даёт.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [table]
+            )
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s',
+                [table]
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def estimated_count(queryset):
+    """Число объектов в выборке.
+
+    Для выборки без фильтров на больших таблицах берётся оценка СУБД
+    вместо точного COUNT(*), иначе считается как обычно.
+    """
+    if not queryset.query.where:
+        estimate = table_estimate(queryset.model, queryset.db)
+        if estimate is not None and estimate > ESTIMATE_THRESHOLD:
+            return estimate
+    return queryset.count()
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, не делающий точный COUNT(*) по огромным таблицам."""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
@@ -0,0 +1,78 @@
+import os
+import pstats
+
+from django.conf import settings
+from django.core import signing
+
+
+TOKEN_SALT: str = 'core.profiling'
+TOKEN_VALUE: str = 'profile'
+MAX_DEPTH: int = 64
+MIN_MICROSECONDS: int = 1
+
+
+def profile_dir():
+    return getattr(
+        settings, 'PROFILER_DIR', os.path.join(settings.BASE_DIR, 'profiles')
+    )
+
+
+def make_token():
+    """Подписанный токен для заголовка X-Profile."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(TOKEN_VALUE)
+
+
+def check_token(token):
+    max_age = getattr(settings, 'PROFILER_TOKEN_MAX_AGE', 60 * 60)
+    try:
+        value = signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=max_age
+        )
+    except signing.BadSignature:
+        return False
+    return value == TOKEN_VALUE
+
+
+def label(func):
+    filename, line, name = func
+    return f'{name} ({os.path.basename(filename)}:{line})'.replace(';', ',')
+
+
+def heaviest_stack(stats, func):
+    """Путь вызовов до функции по самым тяжёлым вызывающим."""
+    path = [func]
+    current = func
+    while len(path) < MAX_DEPTH:
+        callers = [
+            (edge[3], caller)
+            for caller, edge in stats.stats[current][4].items()
+            if caller not in path
+        ]
+        if not callers:
+            break
+        current = max(callers)[1]
+        path.append(current)
+    return reversed(path)
+
+
+def collapsed_stacks(stats):
+    """Строки "a;b;c микросекунды" для flamegraph.pl и speedscope.
+
+    cProfile хранит только пары вызывающий-вызываемый, поэтому собственное
+    время функции относится к одному пути — через самых тяжёлых вызывающих.
+    """
+    totals = {}
+    for func, (_, _, tt, _, _) in stats.stats.items():
+        weight = int(tt * 1e6)
+        if weight < MIN_MICROSECONDS:
+            continue
+        key = ';'.join(label(item) for item in heaviest_stack(stats, func))
+        totals[key] = totals.get(key, 0) + weight
+    return [f'{key} {value}' for key, value in sorted(totals.items())]
+
+
+def load_stats(paths):
+    stats = pstats.Stats(paths[0])
+    for path in paths[1:]:
+        stats.add(path)
+    return stats
@@ -0,0 +1,109 @@
+"""Журнал медленных SQL-запросов с привязкой к представлению."""
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+
+
+logger = logging.getLogger('yatube.slow_queries')
+
+current_view = contextvars.ContextVar('current_view', default='-')
+
+MAX_PARAM_LENGTH: int = 200
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """Приводит SQL к виду без литералов, чтобы группировать похожие."""
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def _param(value):
+    text = repr(value)
+    if len(text) > MAX_PARAM_LENGTH:
+        return text[:MAX_PARAM_LENGTH] + '…'
+    return text
+
+
+@contextmanager
+def attribute(name):
+    """Относит запросы внутри блока к name (представлению или задаче)."""
+    token = current_view.set(name)
+    try:
+        yield
+    finally:
+        current_view.reset(token)
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    """execute_wrapper, пишущий запросы дольше SLOW_QUERY_THRESHOLD."""
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        if duration >= getattr(settings, 'SLOW_QUERY_THRESHOLD', 0.1):
+            normalized = normalize(sql)
+            logger.warning(json.dumps({
+                'ts': time.time(),
+                'view': current_view.get(),
+                'duration_ms': round(duration * 1000, 3),
+                'fingerprint': fingerprint(normalized),
+                'sql': normalized,
+                'params': (
+                    None if many or params is None
+                    else [_param(value) for value in params]
+                ),
+                'many': many,
+            }, ensure_ascii=False))
+
+
+def install(sender, connection, **kwargs):
+    """Обработчик connection_created: вешает обёртку на каждое соединение."""
+    if slow_query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(slow_query_wrapper)
+
+
+class SlowQueryFileHandler(RotatingFileHandler):
+    """Ротируемый файл журнала, сам создающий свою папку."""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+def read_entries(path):
+    """Записи журнала вместе с ротированными файлами."""
+    paths = [path] + [
+        f'{path}.{index}' for index in range(1, 100)
+        if os.path.exists(f'{path}.{index}')
+    ]
+    for log_path in paths:
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path, encoding='utf-8') as source:
+            for line in source:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
@@ -0,0 +1,114 @@
+"""Хранилище медиа с адресацией по содержимому.
+
+Файл называется SHA-256 своего содержимого, поэтому одинаковые картинки
+хранятся один раз, а их URL никогда не меняется. Число ссылок на файл
+ведётся в MediaBlob; файл удаляется, когда ссылок не осталось.
+Запись файла, изменение счётчика и удаление идут под блокировкой строки
+MediaBlob, так что повторная загрузка не теряет файл, который как раз
+удаляется.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+from core.models import MediaBlob
+
+
+HASH_CHUNK: int = 64 * 1024
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks(HASH_CHUNK):
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(
+            directory, digest[:2], digest[2:4], f'{digest}{extension}'
+        ).replace('\\', '/')
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        with transaction.atomic():
+            lock_blob(name, content.size)
+            if not self.exists(name):
+                name = super()._save(name, content)
+            add_reference(name)
+        return name
+
+    def is_immutable(self, name):
+        """Признак имени, выданного этим хранилищем."""
+        stem = os.path.splitext(os.path.basename(name))[0]
+        return len(stem) == 64 and all(c in '0123456789abcdef' for c in stem)
+
+
+_storage = None
+
+
+def get_media_storage():
+    global _storage
+    if _storage is None:
+        _storage = ContentAddressedStorage()
+    return _storage
+
+
+def lock_blob(name, size=0):
+    """Создаёт строку MediaBlob при необходимости и блокирует её.
+
+    Вызывается внутри транзакции. Строку могут удалить, пока мы ждём
+    блокировку, тогда создаём её заново.
+    """
+    while True:
+        MediaBlob.objects.get_or_create(name=name, defaults={'size': size})
+        blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+        if blob is not None:
+            return blob
+
+
+def add_reference(name):
+    MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+
+def acquire(name):
+    """Добавляет ссылку на файл, уже учтённый в MediaBlob.
+
+    Строка для неизвестного имени не создаётся: иначе первый же release
+    удалил бы файл, на который ссылаются записи, не учтённые в счётчике.
+    """
+    with transaction.atomic():
+        if MediaBlob.objects.select_for_update().filter(name=name).exists():
+            add_reference(name)
+
+
+def release(name):
+    """Убирает ссылку на файл; без ссылок файл удаляется после коммита."""
+    if not name:
+        return
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+        if blob is None or not blob.refcount:
+            return
+        MediaBlob.objects.filter(name=name).update(
+            refcount=F('refcount') - 1
+        )
+        if blob.refcount == 1:
+            transaction.on_commit(lambda: delete_unreferenced(name))
+
+
+def delete_unreferenced(name):
+    """Удаляет файл, если до коммита на него не появилось новых ссылок."""
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(
+            name=name, refcount=0
+        ).first()
+        if blob is None:
+            return
+        get_media_storage().delete(name)
+        blob.delete()
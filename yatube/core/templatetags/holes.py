@@ -0,0 +1,17 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core.pagecache import hole_marker
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def hole(template_name, **kwargs):
+    """Место для персонального фрагмента страницы.
+
+    Страница кешируется с маркером, а шаблон template_name отрисовывается
+    для каждого запроса отдельно; kwargs должны сериализоваться в JSON.
+    """
+    return mark_safe(hole_marker(template_name, kwargs))
@@ -0,0 +1,36 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TransactionTestCase
+
+from posts.models import Post, User
+
+
+class LoadTestCommandTests(TransactionTestCase):
+    def test_loadtest_reports_per_url(self):
+        """Нагрузочный прогон выводит статистику по именам URL."""
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Тестовый пост', author=author)
+        out = StringIO()
+        call_command(
+            'loadtest', users=2, logged_in=0.5, duration=0.5,
+            read_only=True, seed=1, stdout=out
+        )
+        self.assertIn('posts:index', out.getvalue())
+        self.assertIn('Всего:', out.getvalue())
+
+    def test_loadtest_fails_on_crashed_user(self):
+        """Исключение в потоке виртуального пользователя не теряется."""
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Тестовый пост', author=author)
+        with patch(
+            'core.management.commands.loadtest.VirtualUser.step',
+            side_effect=RuntimeError('сбой')
+        ):
+            with self.assertRaises(CommandError):
+                call_command(
+                    'loadtest', users=2, duration=0.1, read_only=True,
+                    stdout=StringIO(), stderr=StringIO()
+                )
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.mail import deliver, spool_dir
+
+
+class UnreachableBackend(EmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+
+class DroppingBackend(EmailBackend):
+    """Первое соединение рвётся на первом письме."""
+    opened = 0
+
+    def open(self):
+        DroppingBackend.opened += 1
+        self.broken = DroppingBackend.opened == 1
+
+    def send_messages(self, messages):
+        if self.broken:
+            raise ConnectionResetError('Соединение разорвано')
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.SpoolEmailBackend',
+    MAIL_SPOOL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class MailSpoolTests(TestCase):
+    def setUp(self):
+        spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool, True)
+        overrides = self.settings(MAIL_SPOOL_DIR=spool)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_spooled_mail_sent_by_worker(self):
+        """Письмо сначала попадает в очередь, а отправляет его воркер."""
+        for number in range(3):
+            mail.send_mail(
+                f'Тема {number}', 'Текст', 'from@example.com',
+                ['to@example.com']
+            )
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(os.listdir(spool_dir('new'))), 3)
+        call_command(
+            'send_spooled_mail', burst=True, batch_size=2, stdout=StringIO()
+        )
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            ['Тема 0', 'Тема 1', 'Тема 2']
+        )
+        self.assertEqual(os.listdir(spool_dir('new')), [])
+
+    def test_failed_delivery_retried_then_dropped(self):
+        """Неудачная отправка откладывается, а после лимита — в failed."""
+        mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        unreachable = 'core.tests.test_mail.UnreachableBackend'
+        with override_settings(MAIL_SPOOL_BACKEND=unreachable):
+            self.assertEqual(deliver(), (0, 1))
+            self.assertEqual(deliver(), (0, 0))
+            self.assertEqual(len(os.listdir(spool_dir('new'))), 1)
+            with override_settings(MAIL_SPOOL_MAX_ATTEMPTS=2):
+                for name in os.listdir(spool_dir('new')):
+                    os.rename(
+                        spool_dir('new', name),
+                        spool_dir('new', '0' * 16 + name[16:])
+                    )
+                self.assertEqual(deliver(), (0, 1))
+        self.assertEqual(os.listdir(spool_dir('new')), [])
+        self.assertEqual(len(os.listdir(spool_dir('failed'))), 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_spool_is_json(self):
+        """Письмо хранится в JSON с конвертом, скрытые копии не теряются."""
+        mail.EmailMessage(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'],
+            bcc=['hidden@example.com']
+        ).send()
+        name, = os.listdir(spool_dir('new'))
+        with open(spool_dir('new', name)) as spool_file:
+            entry = json.load(spool_file)
+        self.assertEqual(
+            entry['recipients'], ['to@example.com', 'hidden@example.com']
+        )
+        self.assertEqual(deliver(), (1, 0))
+        self.assertEqual(
+            mail.outbox[0].recipients(),
+            ['to@example.com', 'hidden@example.com']
+        )
+
+    def test_corrupt_file_quarantined(self):
+        """Битый файл уходит в failed, остальные письма отправляются."""
+        os.makedirs(spool_dir('new'))
+        with open(spool_dir('new', '0' * 16 + '-broken.msg'), 'w') as f:
+            f.write('{"raw": ')
+        mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        self.assertEqual(deliver(), (1, 0))
+        self.assertEqual(
+            os.listdir(spool_dir('failed')), ['0' * 16 + '-broken.msg']
+        )
+
+    def test_reconnect_after_dropped_connection(self):
+        """После обрыва соединения остальные письма пачки уходят."""
+        for number in range(2):
+            mail.send_mail(
+                f'Тема {number}', 'Текст', 'from@example.com',
+                ['to@example.com']
+            )
+        DroppingBackend.opened = 0
+        dropping = 'core.tests.test_mail.DroppingBackend'
+        with override_settings(MAIL_SPOOL_BACKEND=dropping):
+            self.assertEqual(deliver(), (1, 1))
+        self.assertEqual(DroppingBackend.opened, 2)
+        self.assertEqual([m.subject for m in mail.outbox], ['Тема 1'])
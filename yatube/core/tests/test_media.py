@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+
+from django.test import Client, TestCase, override_settings
+
+
+class MediaServingTests(TestCase):
+    content = b'0123456789'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, True)
+        overrides = override_settings(MEDIA_ROOT=media_root)
+        overrides.enable()
+        cls.addClassCleanup(overrides.disable)
+        os.makedirs(os.path.join(media_root, 'posts'))
+        cls.name = 'posts/' + 'a' * 64 + '.gif'
+        with open(os.path.join(media_root, cls.name), 'wb') as f:
+            f.write(cls.content)
+        cls.url = '/media/' + cls.name
+
+    def test_full_file_with_cache_headers(self):
+        """Файл отдаётся целиком с долгим кешем и ETag."""
+        response = Client().get(self.url)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['ETag'], '"' + 'a' * 64 + '"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_not_modified(self):
+        """Совпавший If-None-Match даёт 304."""
+        response = Client().get(
+            self.url, HTTP_IF_NONE_MATCH='"' + 'a' * 64 + '"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        """Запрос диапазона отдаёт только нужные байты."""
+        client = Client()
+        response = client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        response = client.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b'789')
+        response = client.get(self.url, HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_invalid_range_ignored(self):
+        """Диапазон с концом раньше начала даёт весь файл с кодом 200."""
+        response = Client().get(self.url, HTTP_RANGE='bytes=5-2')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Range', response)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    @override_settings(MEDIA_OFFLOAD='x-accel-redirect')
+    def test_offload(self):
+        """В режиме разгрузки файл отдаёт веб-сервер."""
+        response = Client().get(self.url)
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/' + self.name)
+        self.assertEqual(response.content, b'')
+
+    def test_path_traversal(self):
+        """Файлы вне MEDIA_ROOT недоступны."""
+        response = Client().get('/media/../manage.py')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,109 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+from django.test import Client, TestCase, override_settings
+
+from core import metrics
+from core.instrumentation import InstrumentedCache
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.metrics_dir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.metrics_dir, True)
+        overrides = override_settings(METRICS_DIR=cls.metrics_dir)
+        overrides.enable()
+        cls.addClassCleanup(overrides.disable)
+
+    def test_request_metrics(self):
+        """Эндпоинт отдаёт метрики запросов, шаблонов и кеша."""
+        client = Client()
+        client.get('/')
+        content = client.get('/metrics/').content.decode()
+        self.assertIn(
+            'yatube_http_requests_total'
+            '{method="GET",status="200",view="posts:index"}',
+            content
+        )
+        self.assertIn(
+            'yatube_http_request_duration_seconds_bucket'
+            '{view="posts:index",le="+Inf"}',
+            content
+        )
+        self.assertIn('template="posts/index.html"', content)
+        self.assertIn('yatube_cache_requests_total', content)
+        self.assertIn('yatube_db_queries_total{view="posts:index"}', content)
+
+    def test_any_cache_backend_counted(self):
+        """Попадания считаются и для кеша, общего между процессами."""
+        cache = InstrumentedCache(
+            os.path.join(self.metrics_dir, 'cache'), {
+                'WRAPPED':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'KEY_PREFIX': 'shared',
+            }
+        )
+        self.assertEqual(type(cache).__name__, 'InstrumentedFileBasedCache')
+        cache.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+        self.assertIsNone(cache.get('missing'))
+        self.assertEqual(cache.get_many(['key', 'missing']), {'key': 'value'})
+        counters = metrics.snapshot()['counters']
+        for result in ('hit', 'miss'):
+            key = (
+                'cache_requests_total',
+                (('cache', 'shared'), ('result', result))
+            )
+            self.assertGreaterEqual(counters.get(key, 0), 1)
+
+    def test_aggregate_processes(self):
+        """Снимки других процессов складываются с текущим."""
+        key = ('test_events_total', ())
+        metrics.inc('test_events_total', 5)
+        metrics.flush(force=True)
+        own = os.path.join(self.metrics_dir, f'{os.getpid()}.json')
+        shutil.copy(
+            own, os.path.join(self.metrics_dir, f'{os.getppid()}.json')
+        )
+        local = metrics.snapshot()['counters'][key]
+        self.assertEqual(metrics.collect()['counters'][key], local * 2)
+
+    def test_dead_process_file_removed(self):
+        """Снимок завершившегося процесса удаляется и не суммируется."""
+        process = subprocess.Popen(['true'])
+        process.wait()
+        metrics.inc('test_dead_total', 5)
+        metrics.flush(force=True)
+        own = os.path.join(self.metrics_dir, f'{os.getpid()}.json')
+        dead = os.path.join(self.metrics_dir, f'{process.pid}.json')
+        shutil.copy(own, dead)
+        key = ('test_dead_total', ())
+        local = metrics.snapshot()['counters'][key]
+        self.assertEqual(metrics.collect()['counters'][key], local)
+        self.assertFalse(os.path.exists(dead))
+
+    def test_dead_threads_retired(self):
+        """Словари завершившихся потоков сливаются, счётчики не теряются."""
+        key = ('test_thread_total', ())
+        before = metrics.snapshot()['counters'].get(key, 0)
+        threads = [
+            threading.Thread(target=metrics.inc, args=('test_thread_total',))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        self.assertEqual(metrics.snapshot()['counters'][key], before + 5)
+        self.assertTrue(
+            all(thread.is_alive() for thread, _ in metrics._stores)
+        )
+
+    def test_forbidden_for_external_ip(self):
+        """Метрики недоступны снаружи."""
+        response = Client(REMOTE_ADDR='10.0.0.1').get('/metrics/')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+from core.profiling import make_token
+
+
+class ProfilerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.profiler_dir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.profiler_dir, True)
+        overrides = override_settings(
+            PROFILER_DIR=cls.profiler_dir, PROFILER_SAMPLE_RATE=0
+        )
+        overrides.enable()
+        cls.addClassCleanup(overrides.disable)
+
+    def test_profile_only_signed_requests(self):
+        """Профилируются только запросы с верным токеном."""
+        client = Client()
+        client.get('/', HTTP_X_PROFILE='wrong')
+        self.assertFalse(os.path.exists(
+            os.path.join(self.profiler_dir, 'posts.index')))
+        client.get('/', HTTP_X_PROFILE=make_token())
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.profiler_dir, 'posts.index'))),
+            1
+        )
+
+    def test_report(self):
+        """Отчёт содержит топ функций и свёрнутые стеки."""
+        Client().get('/', HTTP_X_PROFILE=make_token())
+        out = StringIO()
+        collapsed_dir = os.path.join(self.profiler_dir, 'collapsed')
+        call_command(
+            'profile_report', 'posts:index',
+            collapsed_dir=collapsed_dir, stdout=out
+        )
+        self.assertIn('posts.index', out.getvalue())
+        with open(os.path.join(collapsed_dir, 'posts.index.collapsed')) as f:
+            lines = f.read().split('\n')
+        self.assertTrue(any('index (views.py' in line for line in lines))
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+from core.slowlog import normalize
+
+
+class SlowQueryTests(TestCase):
+    def test_normalize(self):
+        """Литералы и списки IN не влияют на отпечаток запроса."""
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE a = 'x' AND b IN (%s, %s)"),
+            'SELECT * FROM t WHERE a = ? AND b IN (...)'
+        )
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    def test_queries_attributed_to_view(self):
+        """Медленные запросы пишутся с именем представления."""
+        with self.assertLogs('yatube.slow_queries', 'WARNING') as logs:
+            Client().get('/group/unknown/')
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        self.assertIn('posts:group_list', {entry['view'] for entry in entries})
+        self.assertTrue(all(entry['fingerprint'] for entry in entries))
+
+    def test_summary_command(self):
+        """Команда группирует записи по отпечатку."""
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            log_path = os.path.join(directory, 'slow.log')
+            with open(log_path, 'w') as log:
+                for duration in (100, 300):
+                    log.write(json.dumps({
+                        'view': 'posts:index', 'duration_ms': duration,
+                        'fingerprint': 'abc', 'sql': 'SELECT ?',
+                    }) + '\n')
+            call_command('slow_queries', log=log_path, stdout=out)
+        self.assertIn('всего 400.0 мс, 2 раз', out.getvalue())
+        self.assertIn('posts:index (2)', out.getvalue())
@@ -1,6 +1,26 @@
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied, SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
 from http import HTTPStatus
 
+from core import metrics
+from core.storage import get_media_storage
+
+
+IMMUTABLE_MAX_AGE: int = 60 * 60 * 24 * 365
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
 
 def page_not_found(request, exception):
     """Страница 404."""
@@ -23,3 +43,159 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=HTTPStatus.FORBIDDEN)
+
+
+def metrics_view(request):
+    """Метрики всех процессов в текстовом формате Prometheus."""
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', settings.INTERNAL_IPS)
+    if request.META.get('REMOTE_ADDR') not in allowed:
+        raise PermissionDenied
+    return HttpResponse(
+        metrics.render(metrics.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+class RangeReader:
+    """Файл, читаемый только в пределах диапазона байт."""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Один диапазон из заголовка Range или None, если его нет.
+
+    Синтаксически неверный диапазон (конец раньше начала) по RFC 7233
+    игнорируется, и файл отдаётся целиком.
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if start and end and int(end) < int(start):
+        return None
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    return start, end
+
+
+@require_safe
+def serve_sitemap(request, name='sitemap'):
+    """Отдаёт файлы карты сайта, собранные командой build_sitemaps."""
+    full_path = os.path.join(settings.SITEMAP_DIR, f'{name}.xml')
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = FileResponse(
+            open(full_path, 'rb'), content_type='application/xml'
+        )
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Отдаёт медиафайлы с поддержкой ETag, Range и X-Accel-Redirect."""
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    storage = get_media_storage()
+    if storage.is_immutable(name):
+        etag = '"{}"'.format(os.path.splitext(os.path.basename(name))[0])
+        cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+        cache_control = 'public, max-age={}'.format(
+            getattr(settings, 'MEDIA_MAX_AGE', 60 * 60 * 24)
+        )
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = media_response(request, name, full_path, stat, etag)
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def media_response(request, name, full_path, stat, etag):
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    offload = getattr(settings, 'MEDIA_OFFLOAD', None)
+    if offload == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response.headers['X-Accel-Redirect'] = quote(
+            getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+            + name
+        )
+        return response
+    if offload == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response.headers['X-Sendfile'] = full_path
+        return response
+    size = stat.st_size
+    requested = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    byte_range = None
+    if requested and (not if_range or if_range == etag):
+        byte_range = parse_range(requested, size)
+    if byte_range is not None and byte_range[0] >= size:
+        response = HttpResponse(
+            status=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        response.headers['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None or byte_range == (0, size - 1):
+        response = FileResponse(
+            open(full_path, 'rb'), content_type=content_type
+        )
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(
+            RangeReader(open(full_path, 'rb'), start, length),
+            content_type=content_type,
+            status=HTTPStatus.PARTIAL_CONTENT,
+        )
+        response.headers['Content-Length'] = str(length)
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
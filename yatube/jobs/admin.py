@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'created',
+    )
+    list_filter = ('status', 'name')
+    search_fields = ('=idempotency_key',)
+    readonly_fields = ('locked_at', 'last_error', 'created')
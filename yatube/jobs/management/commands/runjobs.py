@@ -0,0 +1,65 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from jobs.queue import claim, execute, requeue_stale
+
+
+class Command(BaseCommand):
+    help = 'Запускает пул воркеров, выполняющих фоновые задачи.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выйти, как только очередь опустеет.'
+        )
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+        requeue_stale()
+        workers = options['workers']
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    self.work, options['poll_interval'], options['burst']
+                )
+                for _ in range(workers)
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                self.stop.set()
+        self.stdout.write(f'Выполнено задач: {self.processed}')
+
+    def work(self, poll_interval, burst):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                job = claim()
+                if job is None:
+                    if burst:
+                        return
+                    self.stop.wait(poll_interval)
+                    continue
+                started = time.monotonic()
+                ok = execute(job)
+                self.stdout.write(
+                    f'{job.name} #{job.pk}: '
+                    f'{"ok" if ok else "error"} '
+                    f'{time.monotonic() - started:.3f}s'
+                )
+                with self.lock:
+                    self.processed += 1
+        finally:
+            connection.close()
@@ -0,0 +1,148 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.slowlog import attribute
+from .models import Job
+from .registry import get_job
+
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE: int = 5
+BACKOFF_MAX: int = 60 * 60
+LOCK_TIMEOUT: int = 15 * 60
+
+
+def enqueue(name, payload=None, key=None, delay=0, max_attempts=5,
+            rearm=False):
+    """Ставит задачу в очередь.
+
+    Повторный вызов с тем же key не создаёт новую задачу,
+    а возвращает уже существующую. С rearm=True завершённая задача
+    с этим ключом снова ставится в очередь в той же строке: так
+    периодические задачи не плодят записи.
+    """
+    run_at = timezone.now() + timedelta(seconds=delay)
+    if key is not None:
+        existing = Job.objects.filter(idempotency_key=key).first()
+        if existing is not None:
+            if rearm and existing.status in (Job.DONE, Job.FAILED):
+                rearmed = Job.objects.filter(
+                    pk=existing.pk, status=existing.status
+                ).update(
+                    status=Job.PENDING,
+                    payload=payload or {},
+                    run_at=run_at,
+                    attempts=0,
+                    last_error='',
+                )
+                existing.refresh_from_db()
+                if rearmed and getattr(settings, 'JOBS_EAGER', False):
+                    transaction.on_commit(lambda: run_job(existing.pk))
+            return existing
+    try:
+        with transaction.atomic():
+            job = Job.objects.create(
+                name=name,
+                payload=payload or {},
+                idempotency_key=key,
+                run_at=run_at,
+                max_attempts=max_attempts,
+            )
+    except IntegrityError:
+        return Job.objects.get(idempotency_key=key)
+    if getattr(settings, 'JOBS_EAGER', False):
+        transaction.on_commit(lambda: run_job(job.pk))
+    return job
+
+
+def backoff(attempts):
+    """Экспоненциальная задержка перед повтором со случайным разбросом."""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay + random.uniform(0, delay / 2)
+
+
+def requeue_stale():
+    """Возвращает в очередь задачи упавших воркеров."""
+    stale = timezone.now() - timedelta(
+        seconds=getattr(settings, 'JOBS_LOCK_TIMEOUT', LOCK_TIMEOUT)
+    )
+    return Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=stale
+    ).update(status=Job.PENDING, locked_at=None)
+
+
+def claim(batch=10):
+    """Забирает одну готовую к запуску задачу.
+
+    Захват делается условным UPDATE, поэтому несколько воркеров
+    не выполнят одну задачу дважды на любой СУБД.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.PENDING, run_at__lte=now
+    ).values_list('pk', flat=True)[:batch]
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def execute(job):
+    """Выполняет захваченную задачу и фиксирует результат."""
+    try:
+        with attribute(f'job:{job.name}'):
+            get_job(job.name)(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Задача %s #%s упала:\n%s', job.name, job.pk, error)
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+        else:
+            job.status = Job.PENDING
+            job.run_at = timezone.now() + timedelta(
+                seconds=backoff(job.attempts)
+            )
+        job.last_error = error
+        job.locked_at = None
+        job.save(update_fields=['status', 'run_at', 'last_error', 'locked_at'])
+        return False
+    job.status = Job.DONE
+    job.locked_at = None
+    job.save(update_fields=['status', 'locked_at'])
+    return True
+
+
+def run_job(pk):
+    """Немедленно выполняет задачу, если её ещё никто не взял."""
+    claimed = Job.objects.filter(pk=pk, status=Job.PENDING).update(
+        status=Job.RUNNING,
+        locked_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    )
+    if claimed:
+        execute(Job.objects.get(pk=pk))
+
+
+def run_pending(limit=None):
+    """Выполняет готовые задачи в текущем потоке, возвращает их число."""
+    done = 0
+    while limit is None or done < limit:
+        job = claim()
+        if job is None:
+            break
+        execute(job)
+        done += 1
+    return done
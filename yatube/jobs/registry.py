@@ -0,0 +1,21 @@
+from django.core.exceptions import ImproperlyConfigured
+
+
+_registry = {}
+
+
+def job(name):
+    """Регистрирует функцию как фоновую задачу под именем name."""
+    def decorator(func):
+        if name in _registry and _registry[name] is not func:
+            raise ImproperlyConfigured(
+                f'Фоновая задача {name} уже зарегистрирована.'
+            )
+        _registry[name] = func
+        func.job_name = name
+        return func
+    return decorator
+
+
+def get_job(name):
+    return _registry[name]
@@ -0,0 +1,64 @@
+from django.test import TestCase
+
+from .models import Job
+from .queue import enqueue, run_pending
+from .registry import job
+
+
+CALLS = []
+
+
+@job('tests.record')
+def record(value):
+    CALLS.append(value)
+
+
+@job('tests.fail')
+def fail():
+    raise ValueError('Ошибка в задаче')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run(self):
+        """Задача из очереди выполняется воркером."""
+        enqueue('tests.record', {'value': 1})
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(CALLS, [1])
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+    def test_idempotency_key(self):
+        """Повторная постановка с тем же ключом не создаёт дубликат."""
+        first = enqueue('tests.record', {'value': 1}, key='same')
+        second = enqueue('tests.record', {'value': 2}, key='same')
+        self.assertEqual(first.pk, second.pk)
+        run_pending()
+        self.assertEqual(CALLS, [1])
+
+    def test_rearm_done_job(self):
+        """rearm ставит выполненную задачу с тем же ключом заново."""
+        first = enqueue('tests.record', {'value': 1}, key='periodic')
+        run_pending()
+        second = enqueue(
+            'tests.record', {'value': 2}, key='periodic', rearm=True
+        )
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(second.status, Job.PENDING)
+        run_pending()
+        self.assertEqual(CALLS, [1, 2])
+
+    def test_retry_with_backoff(self):
+        """Упавшая задача откладывается, а после лимита помечается ошибкой."""
+        task = enqueue('tests.fail', max_attempts=2)
+        run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.status, Job.PENDING)
+        self.assertGreater(task.run_at, task.created)
+        self.assertIn('ValueError', task.last_error)
+        Job.objects.filter(pk=task.pk).update(run_at=task.created)
+        run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.status, Job.FAILED)
+        self.assertEqual(task.attempts, 2)
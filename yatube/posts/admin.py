@@ -1,21 +1,95 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Q
 
-from .models import Comment, Post, Group
+from core.paginator import EstimatedCountPaginator
+from .deletion import STEPS, schedule_deletion
+from .models import Comment, DeletionTask, Post, Group, User
+
+
+class IndexedSearchMixin:
+    """Поиск только по индексированным полям на точное совпадение.
+
+    Число в строке поиска ищется по первичному ключу, остальное —
+    по полям из search_fields, без LIKE по тексту.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        condition = Q()
+        if term.isdigit():
+            condition |= Q(pk=int(term))
+        for field in self.search_fields:
+            condition |= Q(**{field: term})
+        return queryset.filter(condition), False
+
+
+class BackgroundDeletionMixin:
+    """Удаление из админки идёт пачками в фоне через schedule_deletion.
+
+    Синхронный каскад в одной транзакции блокирует таблицы надолго,
+    поэтому delete_selected убран, а удаление объекта только ставит
+    задачу.
+    """
+    deletion_kind = None
+    deletion_message = ''
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        """Страница подтверждения не собирает весь каскад."""
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, type(obj).objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        scheduled = DeletionTask.objects.filter(
+            kind=self.deletion_kind, status=DeletionTask.PENDING
+        ).values('object_id')
+        for obj in queryset.exclude(pk__in=scheduled):
+            schedule_deletion(obj)
+
+    @admin.action(description='Удалить в фоне')
+    def delete_in_background(self, request, queryset):
+        self.delete_queryset(request, queryset)
+        self.message_user(request, self.deletion_message)
 
 
 @admin.register(Group)
-class GroupAdmin(admin.ModelAdmin):
+class GroupAdmin(BackgroundDeletionMixin, admin.ModelAdmin):
     list_display = (
         'pk',
         'title',
         'slug',
-        'description'
+        'description',
+        'deleted_at',
     )
-    search_fields = ('title',)
+    search_fields = ('^title', '=slug')
+    actions = ('delete_in_background',)
+    deletion_kind = DeletionTask.GROUP
+    deletion_message = 'Группы скрыты, удаление идёт в фоне.'
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(BackgroundDeletionMixin, BaseUserAdmin):
+    actions = ('delete_in_background',)
+    deletion_kind = DeletionTask.USER
+    deletion_message = 'Пользователи отключены, удаление идёт в фоне.'
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         'pk',
         'text',
@@ -23,19 +97,54 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'group',
     )
+    list_select_related = ('author', 'group')
     list_editable = ('group',)
-    search_fields = ('text',)
+    autocomplete_fields = ('author', 'group')
+    search_fields = ('author__username', 'group__slug')
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ('pk',
                     'text',
                     'post',
                     'pub_date',
                     'author',)
-    search_fields = ('text',)
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author', 'post')
+    search_fields = ('author__username',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+
+
+@admin.register(DeletionTask)
+class DeletionTaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'kind',
+        'label',
+        'status',
+        'current_step',
+        'processed',
+        'total',
+        'progress',
+        'updated',
+    )
+    list_filter = ('kind', 'status')
+
+    @admin.display(description='Шаг')
+    def current_step(self, obj):
+        steps = STEPS[obj.kind]
+        return steps[min(obj.step, len(steps) - 1)][0]
+
+    @admin.display(description='Готово, %')
+    def progress(self, obj):
+        return obj.progress
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,96 @@
+from django.db import transaction
+
+from core.storage import acquire
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post
+
+
+BATCH_SIZE: int = 500
+
+
+def archive_batch(cutoff, batch_size=BATCH_SIZE):
+    """Переносит в архив одну пачку постов старше cutoff с комментариями.
+
+    Возвращает число перенесённых постов.
+    """
+    with transaction.atomic():
+        ids = list(
+            Post.objects.filter(pub_date__lt=cutoff)
+            .order_by('pub_date')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        archived = [
+            ArchivedPost(
+                id=post.pk,
+                text=post.text,
+                text_html=post.text_html,
+                author_id=post.author_id,
+                group_id=post.group_id,
+                image=post.image.name,
+                pub_date=post.pub_date,
+            )
+            for post in Post.objects.filter(pk__in=ids)
+        ]
+        ArchivedPost.objects.bulk_create(archived)
+        for post in archived:
+            if post.image:
+                acquire(post.image.name)
+        ArchivedComment.objects.bulk_create(
+            (
+                ArchivedComment(
+                    id=comment.pk,
+                    post_id=comment.post_id,
+                    author_id=comment.author_id,
+                    text=comment.text,
+                    parent_id=comment.parent_id,
+                    path=comment.path,
+                    depth=comment.depth,
+                    pub_date=comment.pub_date,
+                )
+                for comment in Comment.objects.filter(
+                    post_id__in=ids).iterator()
+            ),
+            batch_size=batch_size
+        )
+        Post.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+class AuthorPosts:
+    """Лента автора: сначала горячие посты, затем архивные.
+
+    Поддерживает count() и срезы, этого достаточно для Paginator.
+    """
+
+    def __init__(self, author, hot=None, hot_count=None):
+        self.hot = hot if hot is not None else author.posts.select_related(
+            'group'
+        )
+        self.archived = ArchivedPost.objects.filter(
+            author=author
+        ).select_related('group')
+        self._hot_count = hot_count
+
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def count(self):
+        return self.hot_count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        start, stop = key.start or 0, key.stop
+        boundary = self.hot_count()
+        result = []
+        if start < boundary:
+            result += list(self.hot[start:min(stop, boundary)])
+        if stop > boundary:
+            result += list(
+                self.archived[max(start - boundary, 0):stop - boundary]
+            )
+        return result
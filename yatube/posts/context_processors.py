@@ -0,0 +1,17 @@
+from django.utils.functional import SimpleLazyObject
+
+from posts.notifications import unread_count
+
+
+def notifications(request):
+    """Число непрочитанных уведомлений для шапки.
+
+    Значение читается из счётчика по первичному ключу и только
+    если шаблон его действительно использует.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        'unread_notifications': SimpleLazyObject(lambda: unread_count(user))
+    }
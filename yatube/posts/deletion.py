@@ -0,0 +1,216 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.pagecache import purge
+from jobs.queue import enqueue
+from posts.models import (ArchivedComment, ArchivedPost, Comment,
+                          DeletionTask, Follow, Group, Notification, Post,
+                          Reaction, ReactionCounter, User)
+from posts.notifications import discard_unread
+from posts.reactions import increment
+
+
+BATCH_SIZE: int = 500
+BATCH_DELAY: int = 1
+
+COMMENT_MODELS = {Post: Comment, ArchivedPost: ArchivedComment}
+
+
+def ids_batch(queryset, batch_size):
+    return list(
+        queryset.order_by('pk').values_list('pk', flat=True)[:batch_size]
+    )
+
+
+def drop_reactions(target, ids):
+    """Реакции не связаны внешним ключом, их удаляем вместе с объектами."""
+    Reaction.objects.filter(target=target, object_id__in=ids).delete()
+    ReactionCounter.objects.filter(target=target, object_id__in=ids).delete()
+
+
+def delete_posts(queryset, batch_size):
+    """Удаляет пачку постов вместе с реакциями на них и комментарии."""
+    ids = ids_batch(queryset, batch_size)
+    if ids:
+        comments = COMMENT_MODELS[queryset.model].objects.filter(
+            post_id__in=ids
+        )
+        drop_reactions(Reaction.POST, ids)
+        drop_reactions(Reaction.COMMENT, comments.values('pk'))
+        queryset.model.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+def delete_comments(queryset, batch_size):
+    ids = ids_batch(queryset, batch_size)
+    if ids:
+        drop_reactions(Reaction.COMMENT, ids)
+        queryset.model.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+def delete_rows(queryset, batch_size):
+    ids = ids_batch(queryset, batch_size)
+    if ids:
+        queryset.model.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+def delete_reactions(queryset, batch_size):
+    """Снимает реакции пользователя, уменьшая счётчики."""
+    reactions = list(queryset.order_by('pk')[:batch_size])
+    post_ids = set()
+    comment_ids = []
+    for reaction in reactions:
+        increment(reaction.target, reaction.object_id, reaction.kind, -1)
+        if reaction.target == Reaction.POST:
+            post_ids.add(reaction.object_id)
+        else:
+            comment_ids.append(reaction.object_id)
+    for model in COMMENT_MODELS.values():
+        post_ids.update(
+            model.objects.filter(pk__in=comment_ids).values_list(
+                'post_id', flat=True
+            )
+        )
+    Reaction.objects.filter(pk__in=[r.pk for r in reactions]).delete()
+    if post_ids:
+        purge(*(f'post:{pk}' for pk in post_ids))
+    return len(reactions)
+
+
+def delete_notifications(queryset, batch_size):
+    """Удаляет уведомления, списывая непрочитанные со счётчиков."""
+    ids = ids_batch(queryset, batch_size)
+    if ids:
+        batch = Notification.objects.filter(pk__in=ids)
+        discard_unread(batch)
+        batch.delete()
+    return len(ids)
+
+
+def detach_author(queryset, batch_size):
+    """Посты удалённого пользователя остаются без автора, как при
+    on_delete=SET_NULL, но обновляются пачками."""
+    ids = ids_batch(queryset, batch_size)
+    if ids:
+        queryset.model.objects.filter(pk__in=ids).update(author=None)
+    return len(ids)
+
+
+def delete_object(queryset, batch_size):
+    """Последний шаг: сам объект, его связи к этому моменту пусты."""
+    deleted, _ = queryset.delete()
+    return 1 if deleted else 0
+
+
+# Шаги удаления: (название, queryset по id объекта, функция пачки).
+STEPS = {
+    DeletionTask.GROUP: [
+        ('comments', lambda pk: Comment.objects.filter(post__group_id=pk),
+         delete_comments),
+        ('archived comments', lambda pk: ArchivedComment.objects.filter(
+            post__group_id=pk), delete_comments),
+        ('notifications', lambda pk: Notification.objects.filter(
+            post__group_id=pk), delete_notifications),
+        ('posts', lambda pk: Post.objects.filter(group_id=pk),
+         delete_posts),
+        ('archived posts', lambda pk: ArchivedPost.objects.filter(
+            group_id=pk), delete_posts),
+        ('group', lambda pk: Group.objects.filter(pk=pk), delete_object),
+    ],
+    DeletionTask.USER: [
+        ('comments', lambda pk: Comment.objects.filter(author_id=pk),
+         delete_comments),
+        ('archived comments', lambda pk: ArchivedComment.objects.filter(
+            author_id=pk), delete_comments),
+        ('reactions', lambda pk: Reaction.objects.filter(user_id=pk),
+         delete_reactions),
+        ('follows', lambda pk: Follow.objects.filter(
+            Q(user_id=pk) | Q(author_id=pk)), delete_rows),
+        ('notifications', lambda pk: Notification.objects.filter(
+            Q(recipient_id=pk) | Q(actor_id=pk)), delete_notifications),
+        ('posts', lambda pk: Post.objects.filter(author_id=pk),
+         detach_author),
+        ('archived posts', lambda pk: ArchivedPost.objects.filter(
+            author_id=pk), detach_author),
+        ('user', lambda pk: User.objects.filter(pk=pk), delete_object),
+    ],
+}
+
+
+def hide(obj):
+    """Сразу убирает объект с сайта, до удаления каскада."""
+    if isinstance(obj, Group):
+        obj.deleted_at = timezone.now()
+        obj.save(update_fields=['deleted_at'])
+        purge(f'group:{obj.pk}', f'feed:group:{obj.pk}')
+        return DeletionTask.GROUP, obj.title
+    obj.is_active = False
+    obj.save(update_fields=['is_active'])
+    purge(f'author:{obj.pk}', f'feed:author:{obj.pk}')
+    return DeletionTask.USER, obj.username
+
+
+def schedule_deletion(obj):
+    """Скрывает группу или пользователя и ставит удаление в очередь.
+
+    Возвращает DeletionTask, по которому видно ход удаления.
+    """
+    with transaction.atomic():
+        kind, label = hide(obj)
+        task = DeletionTask.objects.create(
+            kind=kind,
+            object_id=obj.pk,
+            label=label,
+            total=sum(
+                queryset(obj.pk).count() for _, queryset, _ in STEPS[kind]
+            ),
+        )
+        enqueue_batch(task, delay=0)
+    return task
+
+
+def enqueue_batch(task, delay=None, rearm=False):
+    """Ключ включает шаг и прогресс: каждая пачка — отдельная задача.
+
+    С rearm=True упавшая пачка, исчерпавшая попытки, ставится заново.
+    """
+    enqueue(
+        'posts.process_deletion',
+        {'task_id': task.pk},
+        key=f'deletion:{task.pk}:{task.step}:{task.processed}',
+        delay=BATCH_DELAY if delay is None else delay,
+        rearm=rearm
+    )
+
+
+def resume_deletions():
+    """Продолжает незавершённые удаления, чья очередная пачка упала."""
+    tasks = list(DeletionTask.objects.filter(status=DeletionTask.PENDING))
+    for task in tasks:
+        enqueue_batch(task, delay=0, rearm=True)
+    return tasks
+
+
+def run_batch(task, batch_size=BATCH_SIZE):
+    """Выполняет одну пачку текущего шага.
+
+    Пустые шаги пропускаются в той же пачке. Возвращает True, пока
+    задача не завершена.
+    """
+    steps = STEPS[task.kind]
+    with transaction.atomic():
+        done = 0
+        while not done and task.step < len(steps):
+            _, queryset, func = steps[task.step]
+            done = func(queryset(task.object_id), batch_size)
+            if done:
+                task.processed += done
+            else:
+                task.step += 1
+        if task.step >= len(steps):
+            task.status = DeletionTask.DONE
+        task.save(update_fields=['step', 'processed', 'status', 'updated'])
+    return task.status != DeletionTask.DONE
@@ -0,0 +1,111 @@
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import truncatechars
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+
+from core.pagecache import tag_response
+from posts.models import Group, Post, User
+
+
+FEED_SIZE: int = 20
+
+
+class LatestPostsFeed(Feed):
+    """RSS последних записей сайта.
+
+    Ответ помечается суррогатным ключом 'feed:…' и кешируется
+    PageCacheMiddleware; сигналы Post сбрасывают его при любом
+    изменении поста, попадающего в ленту.
+    """
+    title = 'Yatube: последние записи'
+    link = reverse_lazy('posts:index')
+    description = 'Новые записи всех авторов.'
+
+    def __call__(self, request, *args, **kwargs):
+        response = super().__call__(request, *args, **kwargs)
+        return tag_response(response, request.feed_key)
+
+    def get_object(self, request, *args, **kwargs):
+        request.feed_key = 'feed:index'
+        return None
+
+    def posts(self, obj):
+        return Post.objects.select_related('author')
+
+    def items(self, obj):
+        return self.posts(obj)[:FEED_SIZE]
+
+    def item_title(self, item):
+        return truncatechars(item.text, 50)
+
+    def item_description(self, item):
+        return item.text_html
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        if item.author is None:
+            return None
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        group = get_object_or_404(Group.objects.visible(), slug=slug)
+        request.feed_key = f'feed:group:{group.pk}'
+        return group
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def description(self, obj):
+        return obj.description
+
+    def posts(self, obj):
+        return obj.group.select_related('author')
+
+
+class AuthorFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        author = get_object_or_404(User, username=username, is_active=True)
+        request.feed_key = f'feed:author:{author.pk}'
+        return author
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def description(self, obj):
+        return f'Записи пользователя {obj.username}.'
+
+    def posts(self, obj):
+        return obj.posts.select_related('author')
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupAtomFeed(GroupFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AuthorAtomFeed(AuthorFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
@@ -1,6 +1,6 @@
 from django import forms
 
-from .models import Post, Comment
+from .models import Comment, Group, Post
 
 
 class PostForm(forms.ModelForm):
@@ -13,11 +13,18 @@ class PostForm(forms.ModelForm):
             'image': 'Картинка для нового поста'
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['group'].queryset = Group.objects.visible()
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
-        fields = ('text',)
+        fields = ('text', 'parent')
+        widgets = {
+            'parent': forms.HiddenInput,
+        }
         help_texts = {
             'text': 'Текст комментария',
         }
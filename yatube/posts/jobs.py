@@ -0,0 +1,61 @@
+from sorl.thumbnail import get_thumbnail
+
+from jobs.registry import job
+from posts.deletion import enqueue_batch, run_batch
+from posts.models import DeletionTask, Post
+from posts.notifications import (notify_comment, notify_followers,
+                                 notify_mentions)
+from posts.paginator import refresh_count
+from posts.reactions import merge_counters
+
+
+THUMBNAIL_GEOMETRY: str = '960x339'
+THUMBNAIL_OPTIONS: dict = {'crop': 'center', 'upscale': True}
+
+
+@job('posts.warm_thumbnail')
+def warm_thumbnail(post_id):
+    """Заранее генерирует миниатюру картинки поста для лент."""
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is not None and post.image:
+        get_thumbnail(post.image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
+
+
+@job('posts.refresh_feed_count')
+def refresh_feed_count(feed, pk=None):
+    """Обновляет кешированное число постов в ленте."""
+    refresh_count(feed, pk)
+
+
+@job('posts.merge_reaction_counters')
+def merge_reaction_counters():
+    """Сливает шарды счётчиков реакций."""
+    merge_counters()
+
+
+@job('posts.notify_followers')
+def notify_post_followers(post_id):
+    """Рассылает подписчикам уведомления о новом посте."""
+    notify_followers(post_id)
+
+
+@job('posts.notify_comment')
+def notify_new_comment(comment_id):
+    """Уведомляет о новом комментарии."""
+    notify_comment(comment_id)
+
+
+@job('posts.notify_mentions')
+def notify_mentioned_users(post_id, user_ids):
+    """Уведомляет упомянутых в посте пользователей."""
+    notify_mentions(post_id, user_ids)
+
+
+@job('posts.process_deletion')
+def process_deletion(task_id):
+    """Одна пачка фонового удаления; следующая ставится в очередь."""
+    task = DeletionTask.objects.filter(
+        pk=task_id, status=DeletionTask.PENDING
+    ).first()
+    if task is not None and run_batch(task):
+        enqueue_batch(task)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import SHARD_SIZE, build
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает изменившиеся файлы карты сайта.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Переписать все шарды, даже неизменившиеся.'
+        )
+
+    def handle(self, *args, **options):
+        written, removed = build(options['shard_size'], options['force'])
+        self.stdout.write(
+            f'Переписано шардов: {written}, удалено: {removed}'
+        )
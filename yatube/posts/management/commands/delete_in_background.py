@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.deletion import resume_deletions, schedule_deletion
+from posts.models import DeletionTask, Group, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Скрывает группу или пользователя и ставит удаление '
+        'в очередь задач; без аргументов показывает ход удалений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'kind', nargs='?', choices=[DeletionTask.GROUP, DeletionTask.USER]
+        )
+        parser.add_argument('name', nargs='?', help='slug или username.')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Заново поставить в очередь незавершённые удаления.'
+        )
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            for task in resume_deletions():
+                self.stdout.write(
+                    f'{task}: продолжено с {task.processed}/{task.total}'
+                )
+            return
+        if options['kind'] is None:
+            for task in DeletionTask.objects.filter(
+                status=DeletionTask.PENDING
+            ):
+                self.stdout.write(
+                    f'{task}: {task.processed}/{task.total} '
+                    f'({task.progress}%)'
+                )
+            return
+        if options['name'] is None:
+            raise CommandError('Укажите slug группы или username.')
+        if options['kind'] == DeletionTask.GROUP:
+            obj = Group.objects.visible().filter(slug=options['name']).first()
+        else:
+            obj = User.objects.filter(
+                username=options['name'], is_active=True
+            ).first()
+        if obj is None:
+            raise CommandError(f'Не найдено: {options["name"]}')
+        task = schedule_deletion(obj)
+        self.stdout.write(
+            f'{task}: скрыто, строк к удалению: {task.total}'
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.reactions import MERGE_BATCH, merge_counters
+
+
+class Command(BaseCommand):
+    help = 'Сливает шарды счётчиков реакций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=MERGE_BATCH)
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            merged = merge_counters(options['batch_size'])
+            total += merged
+            if merged < options['batch_size']:
+                break
+        self.stdout.write(f'Слито счётчиков: {total}')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.summaries import rebuild_group_summaries
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает сводную таблицу по группам.'
+
+    def handle(self, *args, **options):
+        count = rebuild_group_summaries()
+        self.stdout.write(f'Пересобрано сводок: {count}')
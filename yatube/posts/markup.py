@@ -0,0 +1,50 @@
+"""Отрисовка текста поста в HTML при сохранении.
+
+Текст экранируется, #теги и @упоминания существующих пользователей
+становятся ссылками, поддерживаются **жирный**, *курсив* и `код`,
+переводы строк превращаются в абзацы. Результат хранится в
+Post.text_html, поэтому при чтении ни разбор, ни запросы к БД не нужны.
+"""
+import re
+
+from django.urls import reverse
+from django.utils.html import escape, linebreaks
+
+
+TAG_PATTERN = re.compile(r'(?<![\w&/])#(\w{1,64})')
+MENTION_PATTERN = re.compile(r'(?<![\w@&/])@([\w.+-]{0,149}\w)')
+CODE_PATTERN = re.compile(r'`([^`\n]+)`')
+BOLD_PATTERN = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*')
+ITALIC_PATTERN = re.compile(r'(?<![*\w])\*(?=\S)([^*\n]+?)(?<=\S)\*(?![*\w])')
+
+
+def mentioned_usernames(text):
+    return set(MENTION_PATTERN.findall(text))
+
+
+def render_inline(text, usernames):
+    def link_tag(match):
+        url = reverse('posts:tag_posts', args=[match.group(1).lower()])
+        return f'<a href="{url}">#{match.group(1)}</a>'
+
+    def link_mention(match):
+        username = match.group(1)
+        if username not in usernames:
+            return match.group(0)
+        url = reverse('posts:profile', args=[username])
+        return f'<a href="{url}">@{username}</a>'
+
+    text = TAG_PATTERN.sub(link_tag, text)
+    text = MENTION_PATTERN.sub(link_mention, text)
+    text = BOLD_PATTERN.sub(r'<strong>\1</strong>', text)
+    return ITALIC_PATTERN.sub(r'<em>\1</em>', text)
+
+
+def render(text, usernames=frozenset()):
+    """HTML поста; usernames — упомянутые пользователи, которые есть в БД."""
+    parts = CODE_PATTERN.split(escape(text))
+    html = ''.join(
+        f'<code>{part}</code>' if index % 2 else render_inline(part, usernames)
+        for index, part in enumerate(parts)
+    )
+    return linebreaks(html)
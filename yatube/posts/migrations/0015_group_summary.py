@@ -0,0 +1,55 @@
+# Generated by Django 4.0.6 on 2026-10-19 19:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_summaries(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupSummary = apps.get_model('posts', 'GroupSummary')
+    Post = apps.get_model('posts', 'Post')
+    for group in Group.objects.iterator():
+        posts = Post.objects.filter(group=group)
+        latest = posts.order_by('-pub_date').first()
+        GroupSummary.objects.create(
+            group=group,
+            posts_count=posts.count(),
+            last_activity=latest.pub_date if latest else None,
+            latest_post=latest,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupSummary',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='posts.group', verbose_name='Группа')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+                ('last_activity', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Последняя активность')),
+            ],
+            options={
+                'verbose_name': 'Сводка по группе',
+                'verbose_name_plural': 'Сводки по группам',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date'], name='posts_post_group_i_1fdac4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date'], name='posts_post_author__7827da_idx'),
+        ),
+        migrations.AddField(
+            model_name='groupsummary',
+            name='latest_post',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.post', verbose_name='Последний пост'),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
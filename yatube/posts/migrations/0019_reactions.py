@@ -0,0 +1,58 @@
+# Generated by Django 4.0.6 on 2026-10-19 19:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0018_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reaction',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(choices=[('post', 'Пост'), ('comment', 'Комментарий')], max_length=16, verbose_name='Тип объекта')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Объект')),
+                ('kind', models.CharField(choices=[('like', '👍'), ('heart', '❤️'), ('laugh', '😄'), ('sad', '😢')], max_length=16, verbose_name='Реакция')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата')),
+            ],
+            options={
+                'verbose_name': 'Реакция',
+                'verbose_name_plural': 'Реакции',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReactionCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(choices=[('post', 'Пост'), ('comment', 'Комментарий')], max_length=16, verbose_name='Тип объекта')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Объект')),
+                ('kind', models.CharField(choices=[('like', '👍'), ('heart', '❤️'), ('laugh', '😄'), ('sad', '😢')], max_length=16, verbose_name='Реакция')),
+                ('shard', models.PositiveSmallIntegerField(default=0, verbose_name='Шард')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество')),
+            ],
+            options={
+                'verbose_name': 'Счётчик реакций',
+                'verbose_name_plural': 'Счётчики реакций',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reactioncounter',
+            constraint=models.UniqueConstraint(fields=('target', 'object_id', 'kind', 'shard'), name='unique_reaction_counter_shard'),
+        ),
+        migrations.AddField(
+            model_name='reaction',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reactions', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AddConstraint(
+            model_name='reaction',
+            constraint=models.UniqueConstraint(fields=('user', 'target', 'object_id', 'kind'), name='unique_reaction'),
+        ),
+    ]
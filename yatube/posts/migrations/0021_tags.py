@@ -0,0 +1,74 @@
+# Generated by Django 4.0.6 on 2026-10-19 20:11
+
+from django.db import migrations, models
+import re
+
+import django.db.models.deletion
+
+
+def fill_tags(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Tag = apps.get_model('posts', 'Tag')
+    PostTag = apps.get_model('posts', 'PostTag')
+    pattern = re.compile(r'(?<![\w&/])#(\w{1,64})')
+    tag_ids = {}
+    batch = []
+    for post in Post.objects.only('pk', 'text', 'pub_date').iterator():
+        for name in {name.lower() for name in pattern.findall(post.text)}:
+            if name not in tag_ids:
+                tag_ids[name] = Tag.objects.create(name=name).pk
+            batch.append(PostTag(
+                post_id=post.pk, tag_id=tag_ids[name], pub_date=post.pub_date
+            ))
+        if len(batch) >= 1000:
+            PostTag.objects.bulk_create(batch)
+            batch = []
+    PostTag.objects.bulk_create(batch)
+    for tag_id in tag_ids.values():
+        Tag.objects.filter(pk=tag_id).update(
+            posts_count=PostTag.objects.filter(tag_id=tag_id).count()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='Тег')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+            ],
+            options={
+                'verbose_name': 'Тег',
+                'verbose_name_plural': 'Теги',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostTag',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации поста')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='posts.post', verbose_name='Пост')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='posts.tag', verbose_name='Тег')),
+            ],
+            options={
+                'verbose_name': 'Тег поста',
+                'verbose_name_plural': 'Теги постов',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='posttag',
+            index=models.Index(fields=['tag', '-pub_date'], name='posts_postt_tag_id_422b52_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='posttag',
+            constraint=models.UniqueConstraint(fields=('post', 'tag'), name='unique_post_tag'),
+        ),
+        migrations.RunPython(fill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.0.6 on 2026-10-19 20:13
+
+import re
+from urllib.parse import quote
+
+from django.db import migrations, models
+from django.utils.html import escape, linebreaks
+
+
+# Снимок posts.markup на момент миграции: будущие правки отрисовки и
+# адресов не должны менять то, что делает эта миграция.
+TAG_PATTERN = re.compile(r'(?<![\w&/])#(\w{1,64})')
+MENTION_PATTERN = re.compile(r'(?<![\w@&/])@([\w.+-]{0,149}\w)')
+CODE_PATTERN = re.compile(r'`([^`\n]+)`')
+BOLD_PATTERN = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*')
+ITALIC_PATTERN = re.compile(
+    r'(?<![*\w])\*(?=\S)([^*\n]+?)(?<=\S)\*(?![*\w])'
+)
+URL_SAFE = "/~:@!$&'()*+,;="
+
+
+def render_inline(text, usernames):
+    def link_tag(match):
+        url = '/tags/%s/' % quote(match.group(1).lower(), safe=URL_SAFE)
+        return f'<a href="{url}">#{match.group(1)}</a>'
+
+    def link_mention(match):
+        username = match.group(1)
+        if username not in usernames:
+            return match.group(0)
+        url = '/profile/%s/' % quote(username, safe=URL_SAFE)
+        return f'<a href="{url}">@{username}</a>'
+
+    text = TAG_PATTERN.sub(link_tag, text)
+    text = MENTION_PATTERN.sub(link_mention, text)
+    text = BOLD_PATTERN.sub(r'<strong>\1</strong>', text)
+    return ITALIC_PATTERN.sub(r'<em>\1</em>', text)
+
+
+def render(text, usernames):
+    parts = CODE_PATTERN.split(escape(text))
+    html = ''.join(
+        f'<code>{part}</code>' if index % 2 else render_inline(part, usernames)
+        for index, part in enumerate(parts)
+    )
+    return linebreaks(html)
+
+
+def render_html(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    for model_name in ('Post', 'ArchivedPost'):
+        model = apps.get_model('posts', model_name)
+        for post in model.objects.only('pk', 'text').iterator():
+            names = set(MENTION_PATTERN.findall(post.text))
+            usernames = set(
+                User.objects.filter(username__in=names).values_list(
+                    'username', flat=True
+                )
+            ) if names else set()
+            model.objects.filter(pk=post.pk).update(
+                text_html=render(post.text, usernames)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='text_html',
+            field=models.TextField(blank=True, verbose_name='HTML текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('post', 'Новый пост'), ('comment', 'Комментарий'), ('mention', 'Упоминание')], max_length=16, verbose_name='Тип'),
+        ),
+        migrations.RunPython(render_html, migrations.RunPython.noop),
+    ]
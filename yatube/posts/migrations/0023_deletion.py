@@ -0,0 +1,38 @@
+# Generated by Django 4.0.6 on 2026-10-19 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0022_text_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionTask',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('group', 'Группа'), ('user', 'Пользователь')], max_length=16, verbose_name='Что удаляем')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Объект')),
+                ('label', models.CharField(max_length=200, verbose_name='Название')),
+                ('status', models.CharField(choices=[('pending', 'В работе'), ('done', 'Завершено')], default='pending', max_length=16, verbose_name='Статус')),
+                ('step', models.PositiveSmallIntegerField(default=0, verbose_name='Шаг')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Обработано строк')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего строк')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Фоновое удаление',
+                'verbose_name_plural': 'Фоновые удаления',
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Удалена'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.0.6 on 2026-10-19 20:29
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicates(apps, schema_editor):
+    Notification = apps.get_model('posts', 'Notification')
+    duplicates = Notification.objects.filter(
+        kind__in=['post', 'mention']
+    ).values('recipient_id', 'post_id', 'kind').annotate(
+        keep=Min('pk')
+    ).order_by()
+    for row in duplicates.iterator():
+        Notification.objects.filter(
+            recipient_id=row['recipient_id'],
+            post_id=row['post_id'],
+            kind=row['kind'],
+        ).exclude(pk=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0023_deletion'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind__in', ['post', 'mention'])), fields=('recipient', 'post', 'kind'), name='unique_post_notification'),
+        ),
+    ]
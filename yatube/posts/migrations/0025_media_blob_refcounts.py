@@ -0,0 +1,45 @@
+import os
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+
+
+def fill_blobs(apps, schema_editor):
+    """Учитывает картинки, загруженные до хранилища со счётчиком ссылок."""
+    MediaBlob = apps.get_model('core', 'MediaBlob')
+    refcounts = {}
+    for model_name in ('Post', 'ArchivedPost'):
+        model = apps.get_model('posts', model_name)
+        rows = model.objects.exclude(image='').order_by().values(
+            'image'
+        ).annotate(total=Count('pk'))
+        for row in rows:
+            refcounts[row['image']] = (
+                refcounts.get(row['image'], 0) + row['total']
+            )
+    known = set(
+        MediaBlob.objects.filter(name__in=refcounts).values_list(
+            'name', flat=True
+        )
+    )
+    blobs = []
+    for name, refcount in refcounts.items():
+        if name in known:
+            continue
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        blobs.append(MediaBlob(name=name, refcount=refcount, size=size))
+    MediaBlob.objects.bulk_create(blobs, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('posts', '0024_unique_post_notification'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_blobs, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,31 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
 from core.models import CreatedModel
+from core.storage import get_media_storage
+from posts import markup
 
 User = get_user_model()
 
 
+class GroupQuerySet(models.QuerySet):
+    def visible(self):
+        """Группы, не поставленные в очередь на удаление."""
+        return self.filter(deleted_at__isnull=True)
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, max_length=200)
     description = models.TextField()
+    deleted_at = models.DateTimeField(
+        'Удалена',
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    objects = GroupQuerySet.as_manager()
 
     def __str__(self):
         return self.title
@@ -38,19 +54,47 @@ class Post(CreatedModel):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=get_media_storage,
         blank=True
     )
+    text_html = models.TextField('HTML текста', blank=True, editable=False)
 
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['group', '-pub_date']),
+            models.Index(fields=['author', '-pub_date']),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        """Отрисовывает text_html; новых упомянутых кладёт в new_mentions."""
+        names = markup.mentioned_usernames(self.text)
+        users = dict(
+            User.objects.filter(username__in=names).values_list(
+                'username', 'pk'
+            )
+        ) if names else {}
+        self.text_html = markup.render(self.text, users)
+        previous = set() if self._state.adding else (
+            markup.mentioned_usernames(getattr(self, '_loaded_text', '') or '')
+        )
+        self.new_mentions = [
+            pk for username, pk in users.items()
+            if username not in previous and pk != self.author_id
+        ]
+        super().save(*args, **kwargs)
+        self._loaded_text = self.text
+
 
 class Comment(CreatedModel):
+    PATH_STEP = 8
+    MAX_DEPTH = 128
+
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -65,15 +109,69 @@ class Comment(CreatedModel):
         verbose_name='Текст комментария',
         help_text='Введите текст комментария'
     )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='replies',
+        verbose_name='Ответ на'
+    )
+    path = models.CharField(
+        'Путь в ветке',
+        max_length=PATH_STEP * MAX_DEPTH,
+        blank=True,
+        editable=False
+    )
+    depth = models.PositiveSmallIntegerField(
+        'Глубина',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=['post', 'path']),
+        ]
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def path_segment(cls, pk):
+        """pk в base36 фиксированной ширины: строки сортируются как числа."""
+        digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+        segment = ''
+        while pk:
+            pk, remainder = divmod(pk, 36)
+            segment = digits[remainder] + segment
+        return segment.rjust(cls.PATH_STEP, '0')
+
+    def save(self, *args, **kwargs):
+        """Путь зависит от pk, поэтому дописывается вторым запросом
+        в той же транзакции: комментарий без пути никто не увидит."""
+        if self.parent is not None and self.parent.depth >= self.MAX_DEPTH - 1:
+            self.parent = self.parent.parent
+        creating = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if creating:
+                prefix = self.parent.path if self.parent else ''
+                self.path = prefix + self.path_segment(self.pk)
+                self.depth = self.parent.depth + 1 if self.parent else 0
+                Comment.objects.filter(pk=self.pk).update(
+                    path=self.path, depth=self.depth
+                )
+
+    def subtree(self):
+        """Комментарий со всеми ответами в порядке ветки одним запросом."""
+        return Comment.objects.filter(
+            post_id=self.post_id, path__startswith=self.path
+        ).order_by('path')
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -90,3 +188,334 @@ class Follow(models.Model):
         related_name='following',
         verbose_name='Автор'
     )
+
+
+class GroupSummary(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='summary',
+        verbose_name='Группа'
+    )
+    posts_count = models.PositiveIntegerField('Число постов', default=0)
+    last_activity = models.DateTimeField(
+        'Последняя активность',
+        null=True,
+        blank=True,
+        db_index=True
+    )
+    latest_post = models.ForeignKey(
+        Post,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Последний пост'
+    )
+
+    class Meta:
+        verbose_name = 'Сводка по группе'
+        verbose_name_plural = 'Сводки по группам'
+
+    def __str__(self):
+        return f'{self.group}: {self.posts_count}'
+
+
+class ArchivedPost(models.Model):
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст поста')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='archived_posts',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Группа'
+    )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        storage=get_media_storage,
+        blank=True
+    )
+    text_html = models.TextField('HTML текста', blank=True)
+    pub_date = models.DateTimeField('Дата создания')
+    archived_at = models.DateTimeField('Дата архивации', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+        ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['author', '-pub_date']),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments'
+    )
+    text = models.TextField(verbose_name='Текст комментария')
+    parent_id = models.IntegerField(null=True, blank=True)
+    path = models.CharField(
+        'Путь в ветке', max_length=Comment.PATH_STEP * Comment.MAX_DEPTH
+    )
+    depth = models.PositiveSmallIntegerField('Глубина', default=0)
+    pub_date = models.DateTimeField('Дата создания')
+
+    class Meta:
+        verbose_name = 'Архивный комментарий'
+        verbose_name_plural = 'Архивные комментарии'
+        indexes = [
+            models.Index(fields=['post', 'path']),
+        ]
+
+    def __str__(self):
+        return self.text
+
+
+class Reaction(models.Model):
+    POST = 'post'
+    COMMENT = 'comment'
+    TARGETS = [
+        (POST, 'Пост'),
+        (COMMENT, 'Комментарий'),
+    ]
+    KINDS = [
+        ('like', '👍'),
+        ('heart', '❤️'),
+        ('laugh', '😄'),
+        ('sad', '😢'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+        verbose_name='Пользователь'
+    )
+    target = models.CharField('Тип объекта', max_length=16, choices=TARGETS)
+    object_id = models.PositiveIntegerField('Объект')
+    kind = models.CharField('Реакция', max_length=16, choices=KINDS)
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Реакция'
+        verbose_name_plural = 'Реакции'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'target', 'object_id', 'kind'],
+                name='unique_reaction'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} {self.kind} {self.target}:{self.object_id}'
+
+
+class ReactionCounter(models.Model):
+    """Шард счётчика реакций.
+
+    Запись идёт в случайный шард, чтение суммирует шарды,
+    фоновая задача периодически сливает их в одну строку.
+    """
+    SHARDS = 8
+
+    target = models.CharField(
+        'Тип объекта', max_length=16, choices=Reaction.TARGETS
+    )
+    object_id = models.PositiveIntegerField('Объект')
+    kind = models.CharField('Реакция', max_length=16, choices=Reaction.KINDS)
+    shard = models.PositiveSmallIntegerField('Шард', default=0)
+    count = models.IntegerField('Количество', default=0)
+
+    class Meta:
+        verbose_name = 'Счётчик реакций'
+        verbose_name_plural = 'Счётчики реакций'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['target', 'object_id', 'kind', 'shard'],
+                name='unique_reaction_counter_shard'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.target}:{self.object_id} {self.kind}={self.count}'
+
+
+class Notification(models.Model):
+    NEW_POST = 'post'
+    COMMENT = 'comment'
+    MENTION = 'mention'
+    KINDS = [
+        (NEW_POST, 'Новый пост'),
+        (COMMENT, 'Комментарий'),
+        (MENTION, 'Упоминание'),
+    ]
+    # Повторная доставка этих уведомлений о том же посте — дубликат.
+    UNIQUE_KINDS = (NEW_POST, MENTION)
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+',
+        verbose_name='Кто'
+    )
+    kind = models.CharField('Тип', max_length=16, choices=KINDS)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пост'
+    )
+    is_read = models.BooleanField('Прочитано', default=False)
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['recipient', '-created']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipient', 'post', 'kind'],
+                condition=models.Q(kind__in=['post', 'mention']),
+                name='unique_post_notification',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.kind} {self.post_id}'
+
+
+class UnreadCounter(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='unread_counter',
+        verbose_name='Пользователь'
+    )
+    count = models.PositiveIntegerField('Непрочитанных', default=0)
+
+    class Meta:
+        verbose_name = 'Счётчик непрочитанных'
+        verbose_name_plural = 'Счётчики непрочитанных'
+
+    def __str__(self):
+        return f'{self.user}: {self.count}'
+
+
+class Tag(models.Model):
+    name = models.CharField('Тег', max_length=64, unique=True)
+    posts_count = models.PositiveIntegerField('Число постов', default=0)
+
+    class Meta:
+        verbose_name = 'Тег'
+        verbose_name_plural = 'Теги'
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='Пост'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='Тег'
+    )
+    pub_date = models.DateTimeField('Дата публикации поста')
+
+    class Meta:
+        verbose_name = 'Тег поста'
+        verbose_name_plural = 'Теги постов'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'tag'], name='unique_post_tag'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['tag', '-pub_date']),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} {self.tag_id}'
+
+
+class DeletionTask(models.Model):
+    """Фоновое удаление объекта с каскадом, пачками."""
+    GROUP = 'group'
+    USER = 'user'
+    KINDS = [
+        (GROUP, 'Группа'),
+        (USER, 'Пользователь'),
+    ]
+    PENDING = 'pending'
+    DONE = 'done'
+    STATUSES = [
+        (PENDING, 'В работе'),
+        (DONE, 'Завершено'),
+    ]
+
+    kind = models.CharField('Что удаляем', max_length=16, choices=KINDS)
+    object_id = models.PositiveIntegerField('Объект')
+    label = models.CharField('Название', max_length=200)
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUSES, default=PENDING
+    )
+    step = models.PositiveSmallIntegerField('Шаг', default=0)
+    processed = models.PositiveIntegerField('Обработано строк', default=0)
+    total = models.PositiveIntegerField('Всего строк', default=0)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    updated = models.DateTimeField('Обновлено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Фоновое удаление'
+        verbose_name_plural = 'Фоновые удаления'
+        ordering = ['-created']
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.label}'
+
+    @property
+    def progress(self):
+        if self.status == self.DONE:
+            return 100
+        if not self.total:
+            return 0
+        return min(99, 100 * self.processed // self.total)
@@ -0,0 +1,147 @@
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from posts.models import Comment, Follow, Notification, Post, UnreadCounter
+
+
+FANOUT_BATCH: int = 1000
+
+
+def add_unread(user_ids, delta):
+    """Меняет счётчики непрочитанных сразу для пачки пользователей."""
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True
+    )
+    UnreadCounter.objects.filter(user_id__in=user_ids).update(
+        count=Greatest(F('count') + delta, 0)
+    )
+
+
+def discard_unread(notifications):
+    """Списывает со счётчиков непрочитанные уведомления выборки.
+
+    Вызывается перед удалением уведомлений, в том числе каскадным.
+    """
+    rows = notifications.filter(is_read=False).order_by().values(
+        'recipient_id'
+    ).annotate(total=Count('pk'))
+    by_total = {}
+    for row in rows:
+        by_total.setdefault(row['total'], []).append(row['recipient_id'])
+    for total, recipient_ids in by_total.items():
+        add_unread(recipient_ids, -total)
+
+
+def deliver(recipient_ids, kind, post_id, actor_id):
+    """Создаёт уведомления пачкой и увеличивает счётчики.
+
+    Уведомления из UNIQUE_KINDS уже получившим их не создаются, так что
+    повтор задачи после сбоя посреди рассылки не даёт дубликатов.
+    """
+    recipient_ids = [pk for pk in recipient_ids if pk != actor_id]
+    if not recipient_ids:
+        return 0
+    with transaction.atomic():
+        if kind in Notification.UNIQUE_KINDS:
+            delivered = set(
+                Notification.objects.filter(
+                    post_id=post_id, kind=kind, recipient_id__in=recipient_ids
+                ).values_list('recipient_id', flat=True)
+            )
+            recipient_ids = [
+                pk for pk in recipient_ids if pk not in delivered
+            ]
+            if not recipient_ids:
+                return 0
+        Notification.objects.bulk_create([
+            Notification(
+                recipient_id=recipient_id,
+                actor_id=actor_id,
+                kind=kind,
+                post_id=post_id,
+            )
+            for recipient_id in recipient_ids
+        ], ignore_conflicts=True)
+        add_unread(recipient_ids, 1)
+    return len(recipient_ids)
+
+
+def notify_followers(post_id, batch_size=FANOUT_BATCH):
+    """Рассылает подписчикам автора уведомление о новом посте.
+
+    Подписки читаются по первичному ключу пачками, каждая пачка
+    вставляется одним bulk_create в своей транзакции.
+    """
+    post = Post.objects.filter(pk=post_id).only('author_id').first()
+    if post is None or post.author_id is None:
+        return 0
+    sent = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Follow.objects.filter(author_id=post.author_id, pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'user_id')[:batch_size]
+        )
+        if not batch:
+            return sent
+        last_pk = batch[-1][0]
+        sent += deliver(
+            [user_id for _, user_id in batch],
+            Notification.NEW_POST,
+            post.pk,
+            post.author_id
+        )
+
+
+def notify_comment(comment_id):
+    """Сообщает автору поста и автору ветки о новом комментарии."""
+    comment = Comment.objects.select_related('post', 'parent').filter(
+        pk=comment_id
+    ).first()
+    if comment is None:
+        return 0
+    recipients = {comment.post.author_id}
+    if comment.parent is not None:
+        recipients.add(comment.parent.author_id)
+    recipients.discard(None)
+    return deliver(
+        sorted(recipients),
+        Notification.COMMENT,
+        comment.post_id,
+        comment.author_id
+    )
+
+
+def notify_mentions(post_id, user_ids):
+    """Сообщает упомянутым в посте пользователям."""
+    post = Post.objects.filter(pk=post_id).only('author_id').first()
+    if post is None:
+        return 0
+    return deliver(
+        sorted(set(user_ids)), Notification.MENTION, post.pk, post.author_id
+    )
+
+
+def mark_read(user):
+    """Отмечает все уведомления прочитанными и обнуляет счётчик.
+
+    Обнуление, а не вычитание, заодно исправляет счётчик, если он
+    когда-то разошёлся с таблицей уведомлений.
+    """
+    with transaction.atomic():
+        updated = Notification.objects.filter(
+            recipient=user, is_read=False
+        ).update(is_read=True)
+        UnreadCounter.objects.filter(user=user).exclude(count=0).update(
+            count=0
+        )
+    return updated
+
+
+def unread_count(user):
+    return UnreadCounter.objects.filter(user=user).values_list(
+        'count', flat=True
+    ).first() or 0
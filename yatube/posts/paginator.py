@@ -1,11 +1,119 @@
+import time
+
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from core.paginator import estimated_count
+from jobs.queue import enqueue
+from posts.models import GroupSummary, Post
 
 
 PAGE_SELECTION: int = 10
+PAGES_ON_EACH_SIDE: int = 2
+PAGES_ON_ENDS: int = 1
+COUNT_FRESH: int = 60
+COUNT_TIMEOUT: int = 60 * 60 * 24
+
+# Лента подписок кешируется на читателя. Новый пост автора не помечает
+# устаревшими счётчики всех его подписчиков (это рассылка на каждый
+# пост): число страниц в их ленте отстаёт не дольше COUNT_FRESH плюс
+# время до выполнения фонового пересчёта. Подписка и отписка помечают
+# счётчик сразу.
+FEED_COUNTS = {
+    'index': lambda pk: estimated_count(Post.objects.all()),
+    'group': lambda pk: Post.objects.filter(group_id=pk).count(),
+    'follow': lambda pk: Post.objects.filter(
+        author__following__user_id=pk
+    ).count(),
+    'groups': lambda pk: GroupSummary.objects.filter(
+        group__deleted_at__isnull=True
+    ).count(),
+}
+
+
+def count_key(feed, pk=None):
+    return f'feed_count:{feed}:{pk}'
+
+
+def refresh_count(feed, pk=None):
+    """Пересчитывает и кеширует число постов в ленте."""
+    value = FEED_COUNTS[feed](pk)
+    cache.set(
+        count_key(feed, pk),
+        (value, time.time() + COUNT_FRESH),
+        COUNT_TIMEOUT
+    )
+    return value
+
+
+def schedule_refresh(feed, pk=None):
+    """Одна задача пересчёта на ленту, строка задачи переиспользуется."""
+    enqueue(
+        'posts.refresh_feed_count',
+        {'feed': feed, 'pk': pk},
+        key=count_key(feed, pk),
+        rearm=True
+    )
+
+
+def invalidate_count(feed, pk=None):
+    """Помечает счётчик устаревшим, не удаляя его.
+
+    До пересчёта в фоне ленты показывают прежнее значение,
+    так что запись не заставляет следующий запрос делать COUNT(*).
+    """
+    key = count_key(feed, pk)
+    cached = cache.get(key)
+    if cached is None:
+        return
+    cache.set(key, (cached[0], 0), COUNT_TIMEOUT)
+    schedule_refresh(feed, pk)
+
+
+def cached_count(feed, pk=None):
+    """Число постов в ленте из кеша.
+
+    Устаревшее значение отдаётся сразу, а пересчёт уходит
+    в фоновую задачу; синхронно считаем только при пустом кеше.
+    """
+    cached = cache.get(count_key(feed, pk))
+    if cached is None:
+        return refresh_count(feed, pk)
+    value, fresh_until = cached
+    if time.time() > fresh_until:
+        schedule_refresh(feed, pk)
+    return value
+
+
+class FeedPaginator(Paginator):
+    """Пагинатор ленты с кешированным общим числом постов."""
+
+    def __init__(self, object_list, per_page, feed=None, feed_pk=None,
+                 known_count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed = feed
+        self.feed_pk = feed_pk
+        self.known_count = known_count
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        if self.feed is None:
+            return estimated_count(self.object_list)
+        return cached_count(self.feed, self.feed_pk)
 
 
-def get_page(post_list, request):
-    paginator = Paginator(post_list, PAGE_SELECTION)
+def get_page(post_list, request, feed=None, feed_pk=None, count=None):
+    paginator = FeedPaginator(
+        post_list, PAGE_SELECTION, feed, feed_pk, known_count=count
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.page_range = list(paginator.get_elided_page_range(
+        page_obj.number,
+        on_each_side=PAGES_ON_EACH_SIDE,
+        on_ends=PAGES_ON_ENDS,
+    ))
     return page_obj
@@ -0,0 +1,43 @@
+from django.db.models import (Count, Exists, IntegerField, OuterRef,
+                              Subquery, Value)
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
+
+from posts.models import ArchivedPost, Follow, Post, User
+
+
+def count_of(queryset, field):
+    """Подзапрос COUNT(*) по строкам queryset, связанным с OuterRef('pk')."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def get_profile_author(username, viewer):
+    """Автор со всеми данными шапки профиля одним запросом.
+
+    Добавляет hot_posts_count, archived_posts_count, followers_count,
+    following_count и is_followed (подписан ли viewer).
+    """
+    if viewer.is_authenticated:
+        is_followed = Exists(
+            Follow.objects.filter(user=viewer, author=OuterRef('pk'))
+        )
+    else:
+        is_followed = Value(False)
+    authors = User.objects.annotate(
+        hot_posts_count=count_of(Post.objects, 'author'),
+        archived_posts_count=count_of(ArchivedPost.objects, 'author'),
+        followers_count=count_of(Follow.objects, 'author'),
+        following_count=count_of(Follow.objects, 'user'),
+        is_followed=is_followed,
+    )
+    return get_object_or_404(authors, username=username, is_active=True)
@@ -0,0 +1,117 @@
+import random
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from jobs.queue import enqueue
+from posts.models import Reaction, ReactionCounter
+
+
+MERGE_DELAY: int = 60
+MERGE_BATCH: int = 1000
+KIND_LABELS: dict = dict(Reaction.KINDS)
+
+
+def increment(target, object_id, kind, delta):
+    """Меняет счётчик через случайный шард, не блокируя одну строку."""
+    lookup = {
+        'target': target,
+        'object_id': object_id,
+        'kind': kind,
+        'shard': random.randrange(ReactionCounter.SHARDS),
+    }
+    counter = ReactionCounter.objects.filter(**lookup)
+    if not counter.update(count=F('count') + delta):
+        try:
+            with transaction.atomic():
+                ReactionCounter.objects.create(count=delta, **lookup)
+        except IntegrityError:
+            counter.update(count=F('count') + delta)
+    # Одна строка задачи на всё время жизни: ожидающая слияние задача
+    # не меняется, выполненная ставится заново.
+    enqueue(
+        'posts.merge_reaction_counters',
+        key='merge_reactions',
+        delay=MERGE_DELAY,
+        rearm=True
+    )
+
+
+def toggle(user, target, object_id, kind):
+    """Ставит реакцию или снимает уже поставленную.
+
+    Возвращает True, если реакция поставлена.
+    """
+    lookup = {
+        'user': user,
+        'target': target,
+        'object_id': object_id,
+        'kind': kind,
+    }
+    deleted, _ = Reaction.objects.filter(**lookup).delete()
+    if deleted:
+        increment(target, object_id, kind, -1)
+        return False
+    try:
+        with transaction.atomic():
+            Reaction.objects.create(**lookup)
+    except IntegrityError:
+        return True
+    increment(target, object_id, kind, 1)
+    return True
+
+
+def get_counts(target, ids):
+    """Число реакций для набора объектов одним запросом."""
+    rows = ReactionCounter.objects.filter(
+        target=target, object_id__in=ids
+    ).values('object_id', 'kind').annotate(total=Sum('count'))
+    counts = {}
+    for row in rows:
+        if row['total'] > 0:
+            counts.setdefault(row['object_id'], {})[row['kind']] = (
+                row['total']
+            )
+    return counts
+
+
+def attach_counts(objects, target):
+    """Проставляет объектам reactions: список (реакция, значок, число)."""
+    objects = list(objects)
+    counts = get_counts(target, [obj.pk for obj in objects])
+    for obj in objects:
+        found = counts.get(obj.pk, {})
+        obj.reactions = [
+            (kind, label, found[kind])
+            for kind, label in Reaction.KINDS if kind in found
+        ]
+    return objects
+
+
+def merge_counters(batch_size=MERGE_BATCH):
+    """Сливает шарды каждого счётчика в одну строку.
+
+    Возвращает число слитых счётчиков.
+    """
+    groups = ReactionCounter.objects.values(
+        'target', 'object_id', 'kind'
+    ).annotate(shards=Count('pk')).filter(shards__gt=1).order_by()
+    merged = 0
+    for group in groups[:batch_size]:
+        group.pop('shards')
+        with transaction.atomic():
+            rows = list(
+                ReactionCounter.objects.select_for_update()
+                .filter(**group).order_by('shard')
+            )
+            if len(rows) < 2:
+                continue
+            keep, *rest = rows
+            ReactionCounter.objects.filter(
+                pk__in=[row.pk for row in rest]
+            ).delete()
+            ReactionCounter.objects.filter(pk=keep.pk).update(
+                count=sum(row.count for row in rows)
+            )
+        merged += 1
+    return merged
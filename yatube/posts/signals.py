@@ -0,0 +1,235 @@
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from core.pagecache import purge
+from core.storage import release
+from jobs.queue import enqueue
+from posts import summaries, tags
+from posts.deletion import drop_reactions
+from posts.models import (ArchivedComment, ArchivedPost, Comment, Follow,
+                          Group, GroupSummary, Notification, Post, Reaction,
+                          User)
+from posts.notifications import discard_unread
+from posts.paginator import invalidate_count
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_counts(sender, instance, **kwargs):
+    """Сбрасывает кешированные счётчики лент, куда попадает пост.
+
+    Счётчики лент подписок не трогаем, см. FEED_COUNTS.
+    """
+    invalidate_count('index')
+    if instance.group_id:
+        invalidate_count('group', instance.group_id)
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_group_index_count(sender, instance, **kwargs):
+    invalidate_count('groups')
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def invalidate_follow_count(sender, instance, **kwargs):
+    invalidate_count('follow', instance.user_id)
+
+
+def feed_keys(post):
+    """Ленты, в которых появление или удаление поста сдвигает страницы."""
+    keys = ['index', f'author:{post.author_id}']
+    if post.group_id:
+        keys.append(f'group:{post.group_id}')
+    return keys
+
+
+def syndication_keys(post, group_ids):
+    """Ключи RSS/Atom: в ленте виден текст, поэтому сбрасываем на любую
+    правку поста."""
+    keys = ['feed:index', f'feed:author:{post.author_id}']
+    keys.extend(f'feed:group:{group_id}' for group_id in group_ids if group_id)
+    return keys
+
+
+@receiver(post_save, sender=Post)
+def purge_post_pages(sender, instance, created, **kwargs):
+    """Сбрасывает кеш страниц, на которых виден пост.
+
+    Должен срабатывать раньше update_group_summary, который
+    перезаписывает _loaded_group_id.
+    """
+    group_ids = {instance._loaded_group_id, instance.group_id}
+    keys = {f'post:{instance.pk}'}
+    keys.update(syndication_keys(instance, group_ids))
+    if created:
+        keys.update(feed_keys(instance))
+    elif instance._loaded_group_id != instance.group_id:
+        keys.update(
+            f'group:{group_id}' for group_id in group_ids if group_id
+        )
+    purge(*keys)
+
+
+@receiver(post_delete, sender=Post)
+def purge_deleted_post_pages(sender, instance, **kwargs):
+    purge(
+        f'post:{instance.pk}',
+        *feed_keys(instance),
+        *syndication_keys(instance, [instance.group_id])
+    )
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    purge(f'post:{instance.post_id}')
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def purge_follow_pages(sender, instance, **kwargs):
+    """Счётчики подписок видны в профилях обоих пользователей."""
+    purge(f'author:{instance.author_id}', f'author:{instance.user_id}')
+
+
+@receiver(post_save, sender=Group)
+def purge_group_pages(sender, instance, created, **kwargs):
+    """Название и описание группы видны на её странице и в ленте."""
+    if not created:
+        purge(f'group:{instance.pk}', f'feed:group:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def purge_author_pages(sender, instance, created, **kwargs):
+    """Имя автора видно в профиле, в его постах и в его ленте.
+
+    Вход пользователя сохраняет только last_login, его пропускаем.
+    """
+    update_fields = kwargs.get('update_fields')
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    purge(f'author:{instance.pk}', f'feed:author:{instance.pk}')
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._loaded_group_id = instance.__dict__.get('group_id')
+    instance._loaded_text = instance.__dict__.get('text')
+    image = instance.__dict__.get('image')
+    instance._loaded_image = getattr(image, 'name', image) or ''
+
+
+@receiver(post_save, sender=Post)
+def update_group_summary(sender, instance, created, **kwargs):
+    """Поддерживает сводки групп в актуальном состоянии."""
+    old_group_id = instance._loaded_group_id
+    instance._loaded_group_id = instance.group_id
+    if created:
+        if instance.group_id:
+            summaries.post_added(instance)
+        return
+    if old_group_id != instance.group_id:
+        for group_id in (old_group_id, instance.group_id):
+            if group_id:
+                summaries.refresh_group_summary(group_id)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_group_summary(sender, instance, **kwargs):
+    if instance.group_id:
+        summaries.post_removed(instance.group_id)
+
+
+@receiver(post_save, sender=Group)
+def create_group_summary(sender, instance, created, **kwargs):
+    if created:
+        GroupSummary.objects.get_or_create(group=instance)
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, created, **kwargs):
+    """Освобождает картинку, которую заменили при редактировании."""
+    old_image = instance._loaded_image
+    instance._loaded_image = instance.image.name or ''
+    if old_image and old_image != instance._loaded_image:
+        release(old_image)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+def release_image(sender, instance, **kwargs):
+    release(instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+def schedule_post_notifications(sender, instance, created, **kwargs):
+    if created:
+        enqueue(
+            'posts.notify_followers',
+            {'post_id': instance.pk},
+            key=f'notify:post:{instance.pk}'
+        )
+
+
+@receiver(post_save, sender=Comment)
+def schedule_comment_notifications(sender, instance, created, **kwargs):
+    if created:
+        enqueue(
+            'posts.notify_comment',
+            {'comment_id': instance.pk},
+            key=f'notify:comment:{instance.pk}'
+        )
+
+
+@receiver(post_save, sender=Post)
+def sync_post_tags(sender, instance, **kwargs):
+    """Теги следуют за текстом при любом сохранении, не только из формы."""
+    tags.sync_tags(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def remove_post_tags(sender, instance, **kwargs):
+    tags.post_removed(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def discard_post_notifications(sender, instance, **kwargs):
+    """Уведомления удаляются каскадом, счётчики правим заранее."""
+    discard_unread(Notification.objects.filter(post=instance))
+
+
+@receiver(post_delete, sender=Post)
+def drop_post_reactions(sender, instance, **kwargs):
+    """Реакции не связаны внешним ключом; при архивации они остаются."""
+    if not ArchivedPost.objects.filter(pk=instance.pk).exists():
+        drop_reactions(Reaction.POST, [instance.pk])
+
+
+@receiver(post_delete, sender=Comment)
+def drop_comment_reactions(sender, instance, **kwargs):
+    if not ArchivedComment.objects.filter(pk=instance.pk).exists():
+        drop_reactions(Reaction.COMMENT, [instance.pk])
+
+
+@receiver(post_delete, sender=ArchivedPost)
+def drop_archived_post_reactions(sender, instance, **kwargs):
+    drop_reactions(Reaction.POST, [instance.pk])
+
+
+@receiver(post_delete, sender=ArchivedComment)
+def drop_archived_comment_reactions(sender, instance, **kwargs):
+    drop_reactions(Reaction.COMMENT, [instance.pk])
+
+
+@receiver(pre_delete, sender=User)
+def discard_actor_notifications(sender, instance, **kwargs):
+    """Уведомления от удаляемого пользователя уходят каскадом у других."""
+    discard_unread(Notification.objects.filter(actor=instance))
+
+
+@receiver(post_save, sender=Post)
+def schedule_mention_notifications(sender, instance, **kwargs):
+    mentions = getattr(instance, 'new_mentions', None)
+    if mentions:
+        enqueue(
+            'posts.notify_mentions',
+            {'post_id': instance.pk, 'user_ids': mentions}
+        )
@@ -0,0 +1,213 @@
+"""Карта сайта из статических файлов.
+
+Каждый раздел режется на шарды по диапазонам первичного ключа, так что
+изменение объекта затрагивает ровно один файл. Отпечаток шарда (число
+строк, сумма ключей, последняя дата) считается одним агрегатным
+запросом на раздел; для профилей и групп, чей адрес строится из
+username или slug, к нему добавляется хеш этих значений. Файл
+переписывается, только если отпечаток изменился. Строки читаются через
+.iterator() и пишутся в файл сразу, без сборки документа в памяти.
+"""
+import hashlib
+import json
+import os
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, F, Max, Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import ArchivedPost, Group, Post, User
+
+
+SHARD_SIZE: int = 10000
+CHUNK_SIZE: int = 2000
+MANIFEST: str = 'manifest.json'
+INDEX: str = 'sitemap'
+XMLNS: str = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def post_rows(queryset):
+    for pk, pub_date in queryset.values_list('pk', 'pub_date').iterator(
+        chunk_size=CHUNK_SIZE
+    ):
+        yield reverse('posts:post_detail', args=[pk]), pub_date
+
+
+def profile_rows(queryset):
+    for username in queryset.values_list('username', flat=True).iterator(
+        chunk_size=CHUNK_SIZE
+    ):
+        yield reverse('posts:profile', args=[username]), None
+
+
+def group_rows(queryset):
+    for slug in queryset.values_list('slug', flat=True).iterator(
+        chunk_size=CHUNK_SIZE
+    ):
+        yield reverse('posts:group_list', args=[slug]), None
+
+
+# Раздел: (queryset, поле lastmod, строки шарда, поле из адреса).
+SECTIONS = {
+    'posts': (lambda: Post.objects.all(), 'pub_date', post_rows, None),
+    'archive': (
+        lambda: ArchivedPost.objects.all(), 'pub_date', post_rows, None
+    ),
+    'profiles': (
+        lambda: User.objects.filter(is_active=True), None, profile_rows,
+        'username'
+    ),
+    'groups': (lambda: Group.objects.visible(), None, group_rows, 'slug'),
+}
+
+
+def sitemap_dir():
+    return settings.SITEMAP_DIR
+
+
+def base_url():
+    return settings.SITEMAP_BASE_URL.rstrip('/')
+
+
+def name_digests(queryset, name_field, shard_size):
+    """Хеш значений name_field по шардам: переименование меняет адрес."""
+    digests = {}
+    for pk, value in queryset.order_by('pk').values_list(
+        'pk', name_field
+    ).iterator(chunk_size=CHUNK_SIZE):
+        digest = digests.setdefault(str(pk // shard_size), hashlib.md5())
+        digest.update(f'{pk}:{value}\n'.encode())
+    return {shard: digest.hexdigest() for shard, digest in digests.items()}
+
+
+def fingerprints(queryset, date_field, shard_size, name_field=None):
+    """Отпечатки всех непустых шардов раздела одним запросом
+    (и одним проходом по name_field, если он задан)."""
+    aggregates = {'count': Count('pk'), 'keys': Sum('pk')}
+    if date_field:
+        aggregates['last'] = Max(date_field)
+    rows = queryset.order_by().annotate(
+        shard=F('pk') / shard_size
+    ).values('shard').annotate(**aggregates)
+    result = {}
+    for row in rows:
+        shard = row.pop('shard')
+        if row.get('last') is not None:
+            row['last'] = row['last'].isoformat()
+        result[str(shard)] = row
+    if name_field:
+        for shard, digest in name_digests(
+            queryset, name_field, shard_size
+        ).items():
+            result[shard]['names'] = digest
+    return result
+
+
+def shard_name(section, shard):
+    return f'sitemap-{section}-{shard}'
+
+
+def write_atomic(name, chunks):
+    path = os.path.join(sitemap_dir(), f'{name}.xml')
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as sitemap_file:
+        for chunk in chunks:
+            sitemap_file.write(chunk)
+    os.replace(temp_path, path)
+
+
+def urlset(rows):
+    prefix = base_url()
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{XMLNS}">\n'
+    for location, lastmod in rows:
+        yield f'<url><loc>{escape(prefix + location)}</loc>'
+        if lastmod is not None:
+            yield f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+        yield '</url>\n'
+    yield '</urlset>\n'
+
+
+def sitemap_index(manifest):
+    prefix = base_url()
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<sitemapindex xmlns="{XMLNS}">\n'
+    for section in sorted(manifest):
+        for shard in sorted(manifest[section], key=int):
+            location = prefix + reverse(
+                'sitemap_shard', args=[shard_name(section, shard)]
+            )
+            written = manifest[section][shard]['written']
+            yield (
+                f'<sitemap><loc>{escape(location)}</loc>'
+                f'<lastmod>{written}</lastmod></sitemap>\n'
+            )
+    yield '</sitemapindex>\n'
+
+
+def load_manifest():
+    try:
+        with open(os.path.join(sitemap_dir(), MANIFEST)) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    path = os.path.join(sitemap_dir(), MANIFEST)
+    with open(path + '.tmp', 'w') as manifest_file:
+        json.dump(manifest, manifest_file, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def build(shard_size=SHARD_SIZE, force=False):
+    """Перестраивает изменившиеся шарды и индекс.
+
+    Возвращает пару (переписано шардов, удалено шардов).
+    """
+    os.makedirs(sitemap_dir(), exist_ok=True)
+    old = load_manifest()
+    if old.get('shard_size') != shard_size:
+        old, force = {}, True
+    old_sections = old.get('sections', {})
+    sections = {}
+    written = removed = 0
+    today = timezone.now().date().isoformat()
+    for section, (get_queryset, date_field, rows, name_field) in (
+        SECTIONS.items()
+    ):
+        queryset = get_queryset()
+        previous = old_sections.get(section, {})
+        current = {}
+        for shard, fingerprint in fingerprints(
+            queryset, date_field, shard_size, name_field
+        ).items():
+            known = previous.get(shard, {})
+            if not force and known.get('fingerprint') == fingerprint:
+                current[shard] = known
+                continue
+            start = int(shard) * shard_size
+            write_atomic(shard_name(section, shard), urlset(rows(
+                queryset.filter(
+                    pk__gte=start, pk__lt=start + shard_size
+                ).order_by('pk')
+            )))
+            current[shard] = {'fingerprint': fingerprint, 'written': today}
+            written += 1
+        for shard in set(previous) - set(current):
+            try:
+                os.remove(os.path.join(
+                    sitemap_dir(), f'{shard_name(section, shard)}.xml'
+                ))
+            except FileNotFoundError:
+                pass
+            removed += 1
+        sections[section] = current
+    if written or removed or not os.path.exists(
+        os.path.join(sitemap_dir(), f'{INDEX}.xml')
+    ):
+        write_atomic(INDEX, sitemap_index(sections))
+    save_manifest({'shard_size': shard_size, 'sections': sections})
+    return written, removed
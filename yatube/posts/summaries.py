@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+
+from posts.models import Group, GroupSummary, Post
+
+
+BATCH_SIZE: int = 1000
+
+
+def latest_post(group_id):
+    return Post.objects.filter(group_id=group_id).order_by('-pub_date').first()
+
+
+def refresh_group_summary(group_id):
+    """Полностью пересчитывает сводку одной группы."""
+    latest = latest_post(group_id)
+    GroupSummary.objects.update_or_create(
+        group_id=group_id,
+        defaults={
+            'posts_count': Post.objects.filter(group_id=group_id).count(),
+            'last_activity': latest.pub_date if latest else None,
+            'latest_post': latest,
+        }
+    )
+
+
+def post_added(post):
+    """Учитывает новый пост группы без пересчёта всей группы."""
+    updated = GroupSummary.objects.filter(group_id=post.group_id).update(
+        posts_count=F('posts_count') + 1,
+        last_activity=post.pub_date,
+        latest_post=post,
+    )
+    if not updated:
+        refresh_group_summary(post.group_id)
+
+
+def post_removed(group_id):
+    latest = latest_post(group_id)
+    GroupSummary.objects.filter(group_id=group_id).update(
+        posts_count=F('posts_count') - 1,
+        last_activity=latest.pub_date if latest else None,
+        latest_post=latest,
+    )
+
+
+def rebuild_group_summaries():
+    """Пересобирает сводки всех групп одним агрегирующим запросом."""
+    newest = Post.objects.filter(
+        group=OuterRef('pk')
+    ).order_by('-pub_date').values('pk')[:1]
+    groups = Group.objects.annotate(
+        posts_count=Count('group'),
+        last_activity=Max('group__pub_date'),
+        latest_post_id=Subquery(newest),
+    ).values_list('pk', 'posts_count', 'last_activity', 'latest_post_id')
+    summaries = (
+        GroupSummary(
+            group_id=pk,
+            posts_count=posts_count,
+            last_activity=last_activity,
+            latest_post_id=latest_post_id,
+        )
+        for pk, posts_count, last_activity, latest_post_id
+        in groups.iterator()
+    )
+    with transaction.atomic():
+        GroupSummary.objects.all().delete()
+        GroupSummary.objects.bulk_create(summaries, batch_size=BATCH_SIZE)
+    return GroupSummary.objects.count()
@@ -0,0 +1,60 @@
+from django.db import transaction
+from django.db.models import F
+
+from core.pagecache import purge
+from posts.markup import TAG_PATTERN
+from posts.models import PostTag, Tag
+
+
+def extract_tags(text):
+    """Имена тегов из текста поста в нижнем регистре."""
+    return {name.lower() for name in TAG_PATTERN.findall(text)}
+
+
+def tag_keys(tag_ids):
+    return [f'tag:{tag_id}' for tag_id in tag_ids]
+
+
+def sync_tags(post):
+    """Приводит теги поста к тексту и правит счётчики на разницу."""
+    names = extract_tags(post.text)
+    current = dict(
+        PostTag.objects.filter(post=post).values_list('tag__name', 'tag_id')
+    )
+    added = names - set(current)
+    removed = [current[name] for name in set(current) - names]
+    if not added and not removed:
+        return
+    with transaction.atomic():
+        if added:
+            Tag.objects.bulk_create(
+                [Tag(name=name) for name in added], ignore_conflicts=True
+            )
+            added = list(
+                Tag.objects.filter(name__in=added).values_list('pk', flat=True)
+            )
+            PostTag.objects.bulk_create([
+                PostTag(post=post, tag_id=tag_id, pub_date=post.pub_date)
+                for tag_id in added
+            ])
+            Tag.objects.filter(pk__in=added).update(
+                posts_count=F('posts_count') + 1
+            )
+        if removed:
+            PostTag.objects.filter(post=post, tag_id__in=removed).delete()
+            Tag.objects.filter(pk__in=removed).update(
+                posts_count=F('posts_count') - 1
+            )
+    purge(*tag_keys(added), *tag_keys(removed))
+
+
+def post_removed(post):
+    """Вызывается до удаления поста: строки PostTag уйдут каскадом."""
+    tag_ids = list(
+        PostTag.objects.filter(post=post).values_list('tag_id', flat=True)
+    )
+    if tag_ids:
+        Tag.objects.filter(pk__in=tag_ids).update(
+            posts_count=F('posts_count') - 1
+        )
+        purge(*tag_keys(tag_ids))
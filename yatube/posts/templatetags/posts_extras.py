@@ -0,0 +1,25 @@
+from django import template
+
+from posts.forms import CommentForm
+from posts.models import Follow, Reaction
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def is_following(context, username):
+    user = context['user']
+    return user.is_authenticated and Follow.objects.filter(
+        user=user, author__username=username
+    ).exists()
+
+
+@register.simple_tag
+def comment_form():
+    return CommentForm()
+
+
+@register.simple_tag
+def reaction_kinds():
+    return Reaction.KINDS
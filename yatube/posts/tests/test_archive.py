@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import MediaBlob
+from ..archive import archive_batch
+from ..models import ArchivedComment, ArchivedPost, Comment, Post, User
+
+fill_blobs = import_module(
+    'posts.migrations.0025_media_blob_refcounts'
+).fill_blobs
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.old_post = Post.objects.create(
+            text='Старый пост', author=cls.user)
+        cls.comment = Comment.objects.create(
+            post=cls.old_post, author=cls.user, text='Старый комментарий')
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400))
+        cls.new_post = Post.objects.create(
+            text='Новый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        call_command('archive_posts', days=180, batch_size=1, verbosity=0)
+
+    def test_old_posts_moved(self):
+        """Старые посты и их комментарии переносятся в архив."""
+        self.assertFalse(Post.objects.filter(pk=self.old_post.pk).exists())
+        self.assertTrue(Post.objects.filter(pk=self.new_post.pk).exists())
+        self.assertTrue(
+            ArchivedPost.objects.filter(pk=self.old_post.pk).exists())
+        self.assertEqual(
+            ArchivedComment.objects.get(pk=self.comment.pk).post_id,
+            self.old_post.pk
+        )
+
+    def test_read_through(self):
+        """post_detail и profile показывают архивные посты."""
+        client = Client()
+        response = client.get(
+            reverse('posts:post_detail', args=[self.old_post.pk]))
+        self.assertContains(response, 'Старый пост')
+        self.assertContains(response, 'Старый комментарий')
+        self.assertTrue(response.context['is_archived'])
+        response = client.get(reverse('posts:profile', args=['auth']))
+        posts = list(response.context['page_obj'])
+        self.assertEqual(
+            [post.pk for post in posts],
+            [self.new_post.pk, self.old_post.pk]
+        )
+        self.assertEqual(response.context['posts_count'], 2)
+
+
+class LegacyImageArchiveTests(TestCase):
+    """Картинки, загруженные до подсчёта ссылок, не теряются в архиве."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        os.makedirs(os.path.join(self.media_root, 'posts'))
+        self.path = os.path.join(self.media_root, 'posts', 'legacy.gif')
+        with open(self.path, 'wb') as file:
+            file.write(b'GIF89a')
+        user = User.objects.create_user(username='auth')
+        self.post = Post.objects.create(text='Старый пост', author=user)
+        Post.objects.filter(pk=self.post.pk).update(
+            image='posts/legacy.gif',
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+
+    def archive(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_batch(timezone.now() - timedelta(days=180))
+        self.assertEqual(
+            ArchivedPost.objects.get(pk=self.post.pk).image.name,
+            'posts/legacy.gif'
+        )
+
+    def test_unknown_image_kept(self):
+        """Для файла без строки MediaBlob строка не заводится."""
+        self.archive()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_backfilled_image_keeps_refcount(self):
+        """После миграции счётчик переходит от поста к архиву."""
+        fill_blobs(apps, None)
+        self.assertEqual(MediaBlob.objects.get().refcount, 1)
+        self.assertEqual(MediaBlob.objects.get().size, 6)
+        self.archive()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(MediaBlob.objects.get().refcount, 1)
@@ -0,0 +1,173 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.queue import run_pending
+from ..deletion import run_batch, schedule_deletion
+from ..models import (Comment, DeletionTask, Follow, Group, Notification,
+                      Post, Reaction, User)
+from ..notifications import unread_count
+from ..reactions import get_counts, toggle
+
+
+class DeletionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='leaving')
+        self.other = User.objects.create_user(username='staying')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        self.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=self.other, group=self.group)
+            for i in range(3)
+        ]
+        self.client = Client()
+
+    def test_group_hidden_immediately(self):
+        """Группа пропадает с сайта до того, как удалены её посты."""
+        schedule_deletion(self.group)
+        response = self.client.get(
+            reverse('posts:group_list', args=[self.group.slug]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('posts:group_index'))
+        self.assertEqual(len(response.context['page_obj']), 0)
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 3)
+
+    def test_group_deleted_in_batches(self):
+        """Посты группы удаляются пачками, прогресс сохраняется."""
+        task = schedule_deletion(self.group)
+        self.assertEqual(task.total, 4)
+        self.assertTrue(run_batch(task, batch_size=2))
+        self.assertEqual(task.processed, 2)
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 1)
+        while run_batch(task, batch_size=2):
+            pass
+        self.assertEqual(task.status, DeletionTask.DONE)
+        self.assertEqual(task.progress, 100)
+        self.assertFalse(Group.objects.filter(pk=self.group.pk).exists())
+
+    @patch('posts.deletion.BATCH_DELAY', 0)
+    def test_user_deleted_by_jobs(self):
+        """Задачи очереди удаляют пользователя, его посты остаются."""
+        post = Post.objects.create(text='Свой пост', author=self.user)
+        Comment.objects.create(
+            post=self.posts[0], author=self.user, text='Комментарий')
+        Follow.objects.create(user=self.user, author=self.other)
+        toggle(self.user, Reaction.POST, self.posts[0].pk, 'like')
+        run_pending()
+        self.assertEqual(unread_count(self.other), 1)
+        schedule_deletion(self.user)
+        response = self.client.get(
+            reverse('posts:profile', args=[self.user.username]))
+        self.assertEqual(response.status_code, 404)
+        for _ in range(20):
+            run_pending()
+        task = DeletionTask.objects.get(object_id=self.user.pk)
+        self.assertEqual(task.status, DeletionTask.DONE)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertIsNone(Post.objects.get(pk=post.pk).author)
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['posts_count'], 0)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(unread_count(self.other), 0)
+        self.assertEqual(get_counts(Reaction.POST, [self.posts[0].pk]), {})
+
+    @patch('posts.deletion.BATCH_DELAY', 0)
+    def test_group_comments_and_notifications_deleted_first(self):
+        """Комментарии и уведомления группы удаляются своими шагами."""
+        Comment.objects.create(
+            post=self.posts[0], author=self.user, text='Комментарий')
+        run_pending()
+        self.assertEqual(unread_count(self.other), 1)
+        task = schedule_deletion(self.group)
+        self.assertEqual(task.total, 6)
+        run_batch(task)
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 3)
+        for _ in range(20):
+            run_pending()
+        self.assertFalse(Group.objects.filter(pk=self.group.pk).exists())
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(unread_count(self.other), 0)
+
+    @patch('posts.deletion.BATCH_DELAY', 0)
+    def test_failed_batch_resumed(self):
+        """Упавшую пачку можно поставить заново, задача не зависает."""
+        task = schedule_deletion(self.group)
+        Job.objects.filter(name='posts.process_deletion').update(
+            status=Job.FAILED)
+        run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.status, DeletionTask.PENDING)
+        call_command('delete_in_background', resume=True, stdout=StringIO())
+        for _ in range(20):
+            run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.status, DeletionTask.DONE)
+
+    def test_admin_delete_goes_to_background(self):
+        """Удаление из админки не удаляет каскад синхронно."""
+        admin = User.objects.create_superuser(username='admin')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(reverse('admin:posts_group_changelist'))
+        choices = response.context['action_form'].fields['action'].choices
+        self.assertNotIn('delete_selected', dict(choices))
+        url = reverse('admin:posts_group_delete', args=[self.group.pk])
+        self.assertEqual(client.get(url).status_code, 200)
+        client.post(url, {'post': 'yes'})
+        self.assertTrue(
+            DeletionTask.objects.filter(object_id=self.group.pk).exists())
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 3)
+
+    def test_admin_user_delete_goes_to_background(self):
+        """Пользователь из админки удаляется фоновой задачей."""
+        admin = User.objects.create_superuser(username='admin')
+        Follow.objects.create(user=self.user, author=self.other)
+        client = Client()
+        client.force_login(admin)
+        response = client.get(reverse('admin:auth_user_changelist'))
+        choices = response.context['action_form'].fields['action'].choices
+        self.assertNotIn('delete_selected', dict(choices))
+        self.assertIn('delete_in_background', dict(choices))
+        client.post(
+            reverse('admin:auth_user_delete', args=[self.user.pk]),
+            {'post': 'yes'}
+        )
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertTrue(Follow.objects.filter(user=self.user).exists())
+        self.assertEqual(
+            DeletionTask.objects.get(object_id=self.user.pk).kind,
+            DeletionTask.USER
+        )
+
+    @override_settings(PAGE_CACHE_TIMEOUT=60)
+    def test_removed_reactions_purge_post_page(self):
+        """Снятые при удалении реакции сбрасывают страницу поста."""
+        comment = Comment.objects.create(
+            post=self.posts[1], author=self.other, text='Комментарий')
+        toggle(self.user, Reaction.POST, self.posts[0].pk, 'like')
+        toggle(self.user, Reaction.COMMENT, comment.pk, 'like')
+        urls = [
+            reverse('posts:post_detail', args=[post.pk])
+            for post in self.posts[:2]
+        ]
+        for url in urls:
+            self.client.get(url)
+            self.assertEqual(
+                self.client.get(url).get('X-Page-Cache'), 'hit')
+        task = schedule_deletion(self.user)
+        while task.step < 3:
+            run_batch(task)
+        for url in urls:
+            self.assertNotEqual(
+                self.client.get(url).get('X-Page-Cache'), 'hit')
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+        cls.post = Post.objects.create(
+            text='Пост в группе', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_list_posts(self):
+        """Ленты сайта, группы и автора отдают записи в RSS и Atom."""
+        feeds = {
+            reverse('posts:feed_rss'): '<rss',
+            reverse('posts:feed_atom'): '<feed',
+            reverse('posts:group_feed_rss', args=[self.group.slug]): '<rss',
+            reverse('posts:group_feed_atom', args=[self.group.slug]):
+                '<feed',
+            reverse('posts:profile_feed_rss', args=[self.user.username]):
+                '<rss',
+            reverse('posts:profile_feed_atom', args=[self.user.username]):
+                '<feed',
+        }
+        for url, root in feeds.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, root)
+                self.assertContains(response, self.post.text)
+        response = self.guest_client.get(
+            reverse('posts:group_feed_rss', args=['missing']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get(self):
+        """Повторный опрос с ETag получает 304."""
+        url = reverse('posts:feed_atom')
+        etag = self.guest_client.get(url)['ETag']
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(PAGE_CACHE_TIMEOUT=60)
+    def test_feed_cached_until_post_changes(self):
+        """Лента берётся из кеша, пока посты не изменились."""
+        url = reverse('posts:group_feed_rss', args=[self.group.slug])
+        self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный пост'
+        post.save()
+        response = self.guest_client.get(url)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, 'Исправленный пост')
@@ -132,3 +132,23 @@ class PostFormTests(TestCase):
         self.assertRedirects(response, self.make_reverse(self.post_detail))
         self.assertEqual(Comment.objects.count(), comments_count + 1)
         check_comment(self, first_comment, form_data)
+
+    def test_reply_comment_form(self):
+        """Ответ на комментарий попадает в ветку под родителем."""
+        parent = Comment.objects.create(
+            post=self.post, author=self.user, text='Родитель')
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Следующий')
+        form_data = {
+            'text': 'Ответ',
+            'parent': parent.pk,
+        }
+        self.authorized_client.post(
+            self.make_reverse(self.post_comment), data=form_data, follow=True)
+        reply = Comment.objects.get(text='Ответ')
+        self.assertEqual(reply.parent, parent)
+        self.assertEqual(reply.depth, 1)
+        response = self.authorized_client.get(
+            self.make_reverse(self.post_detail))
+        texts = [comment.text for comment in response.context['comments']]
+        self.assertEqual(texts, ['Родитель', 'Ответ', 'Следующий'])
@@ -0,0 +1,51 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from jobs.queue import run_pending
+from ..markup import render
+from ..models import Notification, Post, User
+
+
+class MarkupTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def test_render(self):
+        """Текст экранируется, разметка и ссылки отрисовываются."""
+        html = render(
+            '<b>**жирный** и *курсив* `**код** #нет`\n#Тег @reader @ghost.',
+            {'reader'}
+        )
+        self.assertIn('&lt;b&gt;', html)
+        self.assertIn('<strong>жирный</strong>', html)
+        self.assertIn('<em>курсив</em>', html)
+        self.assertIn('<code>**код** #нет</code>', html)
+        self.assertIn(
+            '<a href="{}">#Тег</a>'.format(
+                reverse('posts:tag_posts', args=['тег'])), html)
+        self.assertIn(
+            '<a href="{}">@reader</a>'.format(
+                reverse('posts:profile', args=['reader'])), html)
+        self.assertIn('@ghost.', html)
+        self.assertIn('<br>', html)
+
+    def test_mentions_rendered_and_notified_once(self):
+        """Упомянутый получает уведомление один раз, HTML хранится в посте."""
+        post = Post.objects.create(text='Привет, @reader!', author=self.author)
+        self.assertIn(
+            reverse('posts:profile', args=['reader']), post.text_html)
+        post.text = 'Привет ещё раз, @reader и @author'
+        post.save()
+        run_pending()
+        self.assertEqual(
+            Notification.objects.filter(
+                kind=Notification.MENTION).count(),
+            1
+        )
+        self.assertEqual(
+            Notification.objects.get(kind=Notification.MENTION).recipient,
+            self.reader
+        )
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
@@ -51,3 +53,29 @@ class PostModelTest(TestCase):
             with self.subTest():
                 self.assertEqual(
                     field, text, 'Вот тут ошибочка')
+
+    def test_comment_subtree(self):
+        """Поддерево комментария выбирается одним запросом по пути."""
+        reply = Comment.objects.create(
+            post=self.post, author=self.user, text='Ответ',
+            parent=self.comment)
+        nested = Comment.objects.create(
+            post=self.post, author=self.user, text='Ответ на ответ',
+            parent=reply)
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Другая ветка')
+        with self.assertNumQueries(1):
+            subtree = list(self.comment.subtree())
+        self.assertEqual(subtree, [self.comment, reply, nested])
+        self.assertEqual(nested.depth, 2)
+
+    def test_comment_without_path_rolled_back(self):
+        """Если путь не записан, комментарий не остаётся без пути."""
+        count = Comment.objects.count()
+        with patch.object(
+            Comment, 'path_segment', side_effect=RuntimeError('сбой')
+        ):
+            with self.assertRaises(RuntimeError):
+                Comment.objects.create(
+                    post=self.post, author=self.user, text='Без пути')
+        self.assertEqual(Comment.objects.count(), count)
@@ -0,0 +1,93 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobs.queue import run_pending
+from ..models import Comment, Follow, Notification, Post, User
+from ..notifications import (add_unread, mark_read, notify_followers,
+                             unread_count)
+
+
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.followers = [
+            User.objects.create_user(username=f'follower{i}')
+            for i in range(3)
+        ]
+        for follower in cls.followers:
+            Follow.objects.create(user=follower, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_new_post_fans_out_in_batches(self):
+        """Подписчики получают уведомление о посте пачками."""
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        Notification.objects.all().delete()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(notify_followers(post.pk, batch_size=2), 3)
+        inserts = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('INSERT')
+            and 'INTO "posts_notification"' in query['sql']
+        ]
+        self.assertEqual(len(inserts), 2)
+        for follower in self.followers:
+            self.assertEqual(unread_count(follower), 1)
+
+    def test_fan_out_retry_is_idempotent(self):
+        """Повтор рассылки не дублирует уведомления и счётчики."""
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        Notification.objects.all().delete()
+        notify_followers(post.pk, batch_size=2)
+        self.assertEqual(notify_followers(post.pk, batch_size=2), 0)
+        self.assertEqual(Notification.objects.count(), 3)
+        for follower in self.followers:
+            self.assertEqual(unread_count(follower), 1)
+
+    def test_comment_and_inbox(self):
+        """Автор поста получает уведомление, входящие сбрасывают счётчик."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.create(
+            post=post, author=self.followers[0], text='Комментарий')
+        run_pending()
+        self.assertEqual(unread_count(self.author), 1)
+        self.assertEqual(unread_count(self.followers[0]), 1)
+        client = Client()
+        client.force_login(self.author)
+        response = client.get(reverse('posts:index'))
+        self.assertEqual(response.context['unread_notifications'], 1)
+        response = client.get(reverse('posts:notifications'))
+        notification = response.context['page_obj'][0]
+        self.assertEqual(notification.kind, Notification.COMMENT)
+        self.assertFalse(notification.is_read)
+        self.assertEqual(unread_count(self.author), 0)
+
+    def test_deleted_post_clears_unread(self):
+        """Удаление поста списывает его уведомления со счётчиков."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        run_pending()
+        self.assertEqual(unread_count(self.followers[0]), 1)
+        post.delete()
+        self.assertEqual(unread_count(self.followers[0]), 0)
+
+    def test_deleted_actor_clears_unread(self):
+        """Удаление пользователя списывает его уведомления у получателей."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        actor = User.objects.create_user(username='actor')
+        Comment.objects.create(post=post, author=actor, text='Комментарий')
+        run_pending()
+        self.assertEqual(unread_count(self.author), 1)
+        actor.delete()
+        self.assertEqual(unread_count(self.author), 0)
+
+    def test_mark_read_resets_counter(self):
+        """Открытие входящих обнуляет разошедшийся счётчик."""
+        add_unread([self.author.pk], 5)
+        mark_read(self.author)
+        self.assertEqual(unread_count(self.author), 0)
@@ -0,0 +1,187 @@
+import base64
+import json
+from unittest.mock import patch
+
+from django.core import signing
+from django.core.cache import cache
+from django.test import (
+    Client, RequestFactory, TestCase, override_settings
+)
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from core.checks import check_page_cache
+from core.pagecache import fill_holes, hole_marker
+from ..models import Comment, Follow, Group, Post, User
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=60)
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+        cls.post = Post.objects.create(
+            text='Первый пост', author=cls.user, group=cls.group)
+        cls.other_post = Post.objects.create(
+            text='Второй пост', author=cls.reader)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def is_cached(self, url):
+        response = self.guest_client.get(url)
+        return response.get('X-Page-Cache') == 'hit'
+
+    def warm(self, *urls):
+        for url in urls:
+            self.guest_client.get(url)
+
+    def test_anonymous_pages_served_from_cache(self):
+        """Повторный анонимный запрос отдаётся из кеша без запросов к БД."""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ]
+        self.warm(*urls)
+        for url in urls:
+            with self.subTest(url=url), self.assertNumQueries(0):
+                self.assertTrue(self.is_cached(url))
+
+    def test_logged_in_users_share_page_with_own_holes(self):
+        """Вошедшие пользователи получают общую страницу со своими дырками."""
+        url = reverse('posts:profile', args=[self.user.username])
+        self.warm(url)
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.warm(url)
+        reader_client = Client()
+        reader_client.force_login(self.reader)
+        response = reader_client.get(url)
+        self.assertEqual(response.get('X-Page-Cache'), 'hit')
+        self.assertContains(response, 'Пользователь: reader')
+        self.assertContains(response, 'Отписаться')
+        self.assertNotContains(response, '<!--hole:')
+        author_client = Client()
+        author_client.force_login(self.user)
+        response = author_client.get(url)
+        self.assertEqual(response.get('X-Page-Cache'), 'hit')
+        self.assertContains(response, 'Пользователь: auth')
+        self.assertContains(response, 'Подписаться')
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        self.assertNotContains(response, 'csrfmiddlewaretoken')
+        response = author_client.get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    def test_holes_do_not_grow_with_comments(self):
+        """Число дырок на странице поста не зависит от числа комментариев."""
+        comments = [
+            Comment.objects.create(
+                post=self.post, author=self.reader, text=f'Комментарий {i}')
+            for i in range(5)
+        ]
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        client = Client()
+        client.force_login(self.reader)
+        client.get(url)
+        with patch(
+            'core.pagecache.render_to_string', wraps=render_to_string
+        ) as render:
+            response = client.get(url)
+        self.assertEqual(response.get('X-Page-Cache'), 'hit')
+        self.assertEqual(render.call_count, 3)
+        self.assertContains(response, 'form="reaction-form"', count=6 * 4)
+        response = client.get(f'{url}?reply_to={comments[0].pk}')
+        self.assertContains(
+            response,
+            f'<input type="hidden" name="parent" value="{comments[0].pk}">'
+        )
+
+    def test_comment_purges_only_its_post(self):
+        """Комментарий сбрасывает страницу своего поста и только её."""
+        post_url = reverse('posts:post_detail', args=[self.post.pk])
+        other_url = reverse('posts:post_detail', args=[self.other_post.pk])
+        self.warm(post_url, other_url)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+        self.assertFalse(self.is_cached(post_url))
+        self.assertTrue(self.is_cached(other_url))
+
+    def test_post_edit_and_follow_purge_pages(self):
+        """Правка поста и подписка сбрасывают связанные страницы."""
+        index_url = reverse('posts:index')
+        group_url = reverse('posts:group_list', args=[self.group.slug])
+        profile_url = reverse('posts:profile', args=[self.reader.username])
+        self.warm(index_url, group_url, profile_url)
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        self.assertFalse(self.is_cached(index_url))
+        self.assertFalse(self.is_cached(group_url))
+        self.assertTrue(self.is_cached(profile_url))
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.assertFalse(self.is_cached(profile_url))
+        self.assertTrue(self.is_cached(index_url))
+
+    def test_group_and_author_edit_purge_pages(self):
+        """Правка группы и профиля автора сбрасывает их страницы."""
+        group_url = reverse('posts:group_list', args=[self.group.slug])
+        profile_url = reverse('posts:profile', args=[self.user.username])
+        self.warm(group_url, profile_url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        self.assertFalse(self.is_cached(group_url))
+        self.assertTrue(self.is_cached(profile_url))
+        author_client = Client()
+        author_client.force_login(self.user)
+        self.assertTrue(self.is_cached(profile_url))
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Имя'
+        user.save()
+        self.assertFalse(self.is_cached(profile_url))
+
+
+class HoleMarkerTests(TestCase):
+    def test_only_signed_markers_rendered(self):
+        """Поддельный маркер не отрисовывает шаблон, подписанный — да."""
+        request = RequestFactory().get('/')
+        request.user = User(username='guest')
+        payload = json.dumps(['includes/header.html', {}]).encode()
+        forged = (
+            '<!--hole:' + base64.urlsafe_b64encode(payload).decode() + '-->'
+        )
+        self.assertEqual(fill_holes(request, forged.encode()), b'')
+        other_salt = signing.dumps(['includes/header.html', {}])
+        self.assertEqual(
+            fill_holes(request, f'<!--hole:{other_salt}-->'.encode()), b'')
+        signed = hole_marker('includes/header.html', {})
+        self.assertNotEqual(fill_holes(request, signed.encode()), b'')
+
+
+class PageCacheCheckTests(TestCase):
+    def test_local_cache_rejected(self):
+        """Кеш страниц не включается с кешем внутри процесса."""
+        local = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+        }}
+        with override_settings(PAGE_CACHE_TIMEOUT=60, CACHES=local):
+            self.assertEqual(
+                [error.id for error in check_page_cache(None)], ['core.E001']
+            )
+        wrapped = {'default': {
+            'BACKEND': 'core.instrumentation.InstrumentedCache',
+            'WRAPPED': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        with override_settings(PAGE_CACHE_TIMEOUT=60, CACHES=wrapped):
+            self.assertEqual(
+                [error.id for error in check_page_cache(None)], ['core.E001']
+            )
+        with override_settings(PAGE_CACHE_TIMEOUT=0, CACHES=local):
+            self.assertEqual(check_page_cache(None), [])
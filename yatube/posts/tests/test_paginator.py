@@ -0,0 +1,80 @@
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.queue import run_pending
+from ..models import Follow, Post, User
+from ..paginator import COUNT_FRESH, PAGE_SELECTION, count_key
+
+
+class FeedPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый текст {i}', author=cls.user)
+            for i in range(PAGE_SELECTION * 30)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_page_range_is_windowed(self):
+        """В пагинаторе выводится окно страниц, а не все страницы."""
+        response = self.client.get(reverse('posts:index') + '?page=15')
+        page_range = response.context['page_obj'].page_range
+        self.assertLess(len(page_range), 15)
+        self.assertIn(1, page_range)
+        self.assertIn(15, page_range)
+        self.assertIn(30, page_range)
+        self.assertNotContains(response, '?page=10"')
+
+    def test_count_is_cached(self):
+        """После записи отдаётся прежнее число, пересчёт идёт в фоне."""
+        self.client.get(reverse('posts:index'))
+        cached_value, _ = cache.get(count_key('index'))
+        self.assertEqual(cached_value, PAGE_SELECTION * 30)
+        Post.objects.create(text='Новый пост', author=self.user)
+        cached_value, fresh_until = cache.get(count_key('index'))
+        self.assertEqual(cached_value, PAGE_SELECTION * 30)
+        self.assertEqual(fresh_until, 0)
+        run_pending()
+        cached_value, _ = cache.get(count_key('index'))
+        self.assertEqual(cached_value, PAGE_SELECTION * 30 + 1)
+
+    def test_refresh_reuses_job_row(self):
+        """Повторные пересчёты ленты не создают новых задач."""
+        self.client.get(reverse('posts:index'))
+        for i in range(3):
+            Post.objects.create(text=f'Пост {i}', author=self.user)
+            run_pending()
+        self.assertEqual(
+            Job.objects.filter(name='posts.refresh_feed_count').count(), 1
+        )
+
+    def test_follow_count_stale_at_most_count_fresh(self):
+        """Счётчик ленты подписок отстаёт от нового поста не дольше
+        COUNT_FRESH и пересчитывается в фоне."""
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.user)
+        self.client.force_login(reader)
+        url = reverse('posts:follow_index')
+        self.client.get(url)
+        Post.objects.create(text='Новый пост', author=self.user)
+        key = count_key('follow', reader.pk)
+        self.assertEqual(cache.get(key)[0], PAGE_SELECTION * 30)
+        later = time.time() + COUNT_FRESH + 1
+        with patch('posts.paginator.time.time', return_value=later):
+            response = self.client.get(url)
+        self.assertEqual(
+            response.context['page_obj'].paginator.count,
+            PAGE_SELECTION * 30
+        )
+        run_pending()
+        self.assertEqual(cache.get(key)[0], PAGE_SELECTION * 30 + 1)
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from ..archive import archive_batch
+from ..models import Comment, Post, Reaction, ReactionCounter, User
+from ..reactions import get_counts, merge_counters, toggle
+
+
+class ReactionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.user)
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.user, text='Комментарий')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_toggle(self):
+        """Повторная реакция снимает предыдущую."""
+        self.assertTrue(toggle(self.user, Reaction.POST, self.post.pk, 'like'))
+        self.assertEqual(
+            get_counts(Reaction.POST, [self.post.pk]),
+            {self.post.pk: {'like': 1}}
+        )
+        self.assertFalse(
+            toggle(self.user, Reaction.POST, self.post.pk, 'like'))
+        self.assertEqual(get_counts(Reaction.POST, [self.post.pk]), {})
+        self.assertFalse(Reaction.objects.exists())
+
+    def test_merge_shards(self):
+        """Шарды одного счётчика сливаются в одну строку с суммой."""
+        for shard in range(3):
+            ReactionCounter.objects.create(
+                target=Reaction.POST, object_id=self.post.pk,
+                kind='heart', shard=shard, count=2)
+        self.assertEqual(merge_counters(), 1)
+        counter = ReactionCounter.objects.get()
+        self.assertEqual(counter.count, 6)
+        call_command('merge_reaction_counters', verbosity=0)
+        self.assertEqual(ReactionCounter.objects.count(), 1)
+
+    def test_merge_job_rearmed(self):
+        """Слияние шардов идёт одной строкой задачи, а не новой в минуту."""
+        toggle(self.user, Reaction.POST, self.post.pk, 'like')
+        Job.objects.update(status=Job.DONE)
+        toggle(self.user, Reaction.POST, self.post.pk, 'like')
+        job = Job.objects.get(name='posts.merge_reaction_counters')
+        self.assertEqual(job.status, Job.PENDING)
+
+    def test_reactions_dropped_with_objects(self):
+        """Реакции удаляются вместе с постом и комментарием."""
+        post = Post.objects.create(text='Пост', author=self.user)
+        comment = Comment.objects.create(
+            post=post, author=self.user, text='Комментарий')
+        toggle(self.user, Reaction.POST, post.pk, 'like')
+        toggle(self.user, Reaction.COMMENT, comment.pk, 'like')
+        toggle(self.user, Reaction.POST, self.post.pk, 'like')
+        post.delete()
+        self.assertEqual(
+            list(Reaction.objects.values_list('object_id', flat=True)),
+            [self.post.pk]
+        )
+        self.assertEqual(
+            set(ReactionCounter.objects.values_list('object_id', flat=True)),
+            {self.post.pk}
+        )
+
+    def test_reactions_kept_on_archive(self):
+        """Перенос в архив не считается удалением поста."""
+        toggle(self.user, Reaction.POST, self.post.pk, 'like')
+        toggle(self.user, Reaction.COMMENT, self.comment.pk, 'like')
+        Post.objects.filter(pk=self.post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400))
+        archive_batch(timezone.now() - timedelta(days=180))
+        self.assertEqual(Reaction.objects.count(), 2)
+        self.assertEqual(
+            get_counts(Reaction.COMMENT, [self.comment.pk]),
+            {self.comment.pk: {'like': 1}}
+        )
+
+    def test_react_views(self):
+        """Реакции на пост и комментарий видны в ленте и в посте."""
+        self.authorized_client.post(
+            reverse('posts:react', args=[self.post.pk]), {'kind': 'laugh'})
+        self.authorized_client.post(
+            reverse('posts:react_comment',
+                    args=[self.post.pk, self.comment.pk]),
+            {'kind': 'like'})
+        self.authorized_client.post(
+            reverse('posts:react', args=[self.post.pk]), {'kind': 'bogus'})
+        response = self.authorized_client.get(reverse('posts:index'))
+        post = response.context['page_obj'][0]
+        self.assertEqual(post.reactions, [('laugh', '😄', 1)])
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        self.assertEqual(
+            response.context['comments'][0].reactions, [('like', '👍', 1)])
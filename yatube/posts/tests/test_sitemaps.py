@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Group, Post, User
+from ..sitemaps import build
+
+
+TEMP_SITEMAP_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    SITEMAP_DIR=TEMP_SITEMAP_DIR, SITEMAP_BASE_URL='https://yatube.test'
+)
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {i}', author=cls.user)
+            for i in range(5)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_SITEMAP_DIR, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(TEMP_SITEMAP_DIR, ignore_errors=True)
+
+    def test_sitemap_served(self):
+        """Индекс ссылается на шарды, шарды содержат адреса страниц."""
+        build(shard_size=2)
+        client = Client()
+        response = client.get(reverse('sitemap'))
+        self.assertContains(
+            response, 'https://yatube.test/sitemaps/sitemap-groups-')
+        shard = self.posts[0].pk // 2
+        response = client.get(
+            reverse('sitemap_shard', args=[f'sitemap-posts-{shard}']))
+        self.assertContains(
+            response,
+            'https://yatube.test'
+            + reverse('posts:post_detail', args=[self.posts[0].pk])
+        )
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        response = client.get(
+            reverse('sitemap_shard', args=['sitemap-posts-999999']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_only_changed_shards_rewritten(self):
+        """Повторная сборка переписывает только изменившиеся шарды."""
+        first_written, _ = build(shard_size=2)
+        self.assertGreater(first_written, 0)
+        self.assertEqual(build(shard_size=2), (0, 0))
+        Post.objects.filter(pk=self.posts[0].pk).delete()
+        written, removed = build(shard_size=2)
+        self.assertEqual(written + removed, 1)
+        self.assertGreater(build(shard_size=2, force=True)[0], 1)
+
+    def test_rename_rewrites_shard_login_does_not(self):
+        """Смена slug переписывает шард, вход пользователя — нет."""
+        build(shard_size=2)
+        User.objects.filter(pk=self.user.pk).update(last_login=timezone.now())
+        self.assertEqual(build(shard_size=2), (0, 0))
+        Group.objects.filter(pk=self.group.pk).update(slug='new-slug')
+        self.assertEqual(build(shard_size=2), (1, 0))
+        response = Client().get(reverse(
+            'sitemap_shard', args=[f'sitemap-groups-{self.group.pk // 2}']
+        ))
+        self.assertContains(response, '/group/new-slug/')
@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from jobs.queue import run_pending
+from ..models import Group, GroupSummary, Post, User
+from ..summaries import rebuild_group_summaries
+
+
+class GroupSummaryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Другое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def summary(self, group):
+        return GroupSummary.objects.get(group=group)
+
+    def test_summary_follows_posts(self):
+        """Сводка группы обновляется при создании, переносе и удалении."""
+        Post.objects.create(text='Первый', author=self.user, group=self.group)
+        post = Post.objects.create(
+            text='Второй', author=self.user, group=self.group)
+        summary = self.summary(self.group)
+        self.assertEqual(summary.posts_count, 2)
+        self.assertEqual(summary.latest_post, post)
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(self.summary(self.group).posts_count, 1)
+        self.assertEqual(self.summary(self.other_group).posts_count, 1)
+        post.delete()
+        summary = self.summary(self.other_group)
+        self.assertEqual(summary.posts_count, 0)
+        self.assertIsNone(summary.latest_post)
+
+    def test_rebuild(self):
+        """Команда пересборки восстанавливает сводки."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, group=self.group)
+        GroupSummary.objects.all().delete()
+        self.assertEqual(rebuild_group_summaries(), 2)
+        self.assertEqual(self.summary(self.group).latest_post, post)
+
+    def test_group_index(self):
+        """Каталог групп строится фиксированным числом запросов."""
+        Post.objects.create(text='Пост', author=self.user, group=self.group)
+        with self.assertNumQueries(2):
+            response = Client().get(reverse('posts:group_index'))
+        self.assertContains(response, self.group.title)
+        self.assertContains(response, self.other_group.title)
+
+    def test_group_index_count_cached(self):
+        """Число групп в каталоге берётся из кеша, без COUNT(*)."""
+        url = reverse('posts:group_index')
+        Client().get(url)
+        with self.assertNumQueries(1):
+            response = Client().get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+        Group.objects.create(title='Третья', slug='third', description='')
+        run_pending()
+        response = Client().get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post, PostTag, Tag, User
+from ..tags import extract_tags
+
+
+class TagTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def counts(self):
+        return dict(Tag.objects.values_list('name', 'posts_count'))
+
+    def test_extract_tags(self):
+        self.assertEqual(
+            extract_tags('#Django и #питон, не тег: a#b &#39; #django'),
+            {'django', 'питон'}
+        )
+
+    def test_tags_synced_on_create_edit_and_delete(self):
+        """Теги и их счётчики следуют за текстом поста."""
+        self.authorized_client.post(
+            reverse('posts:post_create'), {'text': 'Пост про #Django #python'})
+        post = Post.objects.get()
+        self.assertEqual(self.counts(), {'django': 1, 'python': 1})
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=[post.pk]),
+            {'text': 'Теперь про #python и #новое'})
+        self.assertEqual(
+            self.counts(), {'django': 0, 'python': 1, 'новое': 1})
+        response = self.authorized_client.get(
+            reverse('posts:tag_posts', args=['python']))
+        self.assertEqual(list(response.context['page_obj']), [post])
+        self.assertContains(
+            response, reverse('posts:tag_posts', args=['новое']))
+        post.delete()
+        self.assertEqual(
+            self.counts(), {'django': 0, 'python': 0, 'новое': 0})
+        self.assertFalse(PostTag.objects.exists())
+
+    def test_tags_synced_on_orm_save(self):
+        """Теги появляются и при сохранении поста в обход формы."""
+        post = Post.objects.create(text='Пост про #shell', author=self.user)
+        self.assertEqual(self.counts(), {'shell': 1})
+        post.text = 'Пост про #admin'
+        post.save()
+        self.assertEqual(self.counts(), {'shell': 0, 'admin': 1})
+        self.assertEqual(
+            list(post.post_tags.values_list('tag__name', flat=True)),
+            ['admin']
+        )
@@ -223,6 +223,7 @@ class PaginatorViewTest(TestCase):
             )
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
 
     def test_first_page_contains_ten_records(self):
@@ -304,3 +305,19 @@ class FollowTests(TestCase):
             self.make_reverse(self.index_follow))
         follow_context = response.context['page_obj']
         self.assertNotIn(self.post, follow_context)
+
+    def test_profile_header_counts(self):
+        """Шапка профиля собирается одним запросом со счётчиками."""
+        Follow.objects.create(user=self.user_1, author=self.user_2)
+        url = self.make_reverse(('posts:profile', [self.user_2.username]))
+        guest = Client()
+        # Шапка, страница постов и счётчики реакций.
+        with self.assertNumQueries(3):
+            response = guest.get(url)
+        author = response.context['author']
+        self.assertEqual(response.context['posts_count'], 1)
+        self.assertEqual(author.followers_count, 1)
+        self.assertEqual(author.following_count, 0)
+        self.assertFalse(response.context['following'])
+        response = self.authorized_client.get(url)
+        self.assertTrue(response.context['following'])
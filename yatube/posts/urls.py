@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 
 app_name = 'posts'
@@ -8,6 +8,30 @@ app_name = 'posts'
 urlpatterns = [
     path('', views.index, name='index'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('groups/', views.group_index, name='group_index'),
+    path('tags/<str:name>/', views.tag_posts, name='tag_posts'),
+    path('feeds/latest.rss', feeds.LatestPostsFeed(), name='feed_rss'),
+    path('feeds/latest.atom', feeds.LatestPostsAtomFeed(), name='feed_atom'),
+    path(
+        'group/<slug:slug>/feed.rss',
+        feeds.GroupFeed(),
+        name='group_feed_rss'
+    ),
+    path(
+        'group/<slug:slug>/feed.atom',
+        feeds.GroupAtomFeed(),
+        name='group_feed_atom'
+    ),
+    path(
+        'profile/<str:username>/feed.rss',
+        feeds.AuthorFeed(),
+        name='profile_feed_rss'
+    ),
+    path(
+        'profile/<str:username>/feed.atom',
+        feeds.AuthorAtomFeed(),
+        name='profile_feed_atom'
+    ),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
@@ -15,6 +39,13 @@ urlpatterns = [
     path(
         'posts/<int:post_id>/comment/', views.add_comment, name='add_comment'
     ),
+    path('posts/<int:post_id>/react/', views.react, name='react'),
+    path(
+        'posts/<int:post_id>/comments/<int:comment_id>/react/',
+        views.react_comment,
+        name='react_comment'
+    ),
+    path('notifications/', views.notifications, name='notifications'),
     path('follow/', views.follow_index, name='follow_index'),
     path(
         'profile/<str:username>/follow/',
@@ -1,73 +1,163 @@
 from django.contrib.auth.decorators import login_required
+from django.db.models import F
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.pagecache import post_keys, purge, tag_response
+from jobs.queue import enqueue
+from posts.archive import AuthorPosts
 from posts.forms import CommentForm, PostForm
-from posts.models import Comment, Follow, Group, Post, User
+from posts.models import (ArchivedPost, Comment, Follow, Group, GroupSummary,
+                          Notification, Post, Reaction, Tag, User)
+from posts.notifications import mark_read
 from posts.paginator import get_page
+from posts.profiles import get_profile_author
+from posts.reactions import KIND_LABELS, attach_counts, toggle
 
 
 PAGE_SELECTION: int = 10
 
 
+def schedule_post_processing(post):
+    """Ставит в очередь обработку поста после сохранения."""
+    if post.image:
+        enqueue(
+            'posts.warm_thumbnail',
+            {'post_id': post.pk},
+            key=f'thumbnail:{post.image.name}'
+        )
+
+
+def with_reactions(page_obj):
+    """Подгружает счётчики реакций для всей страницы ленты."""
+    page_obj.object_list = attach_counts(page_obj.object_list, Reaction.POST)
+    return page_obj
+
+
 def index(request):
     """Главная страница."""
     post_list = Post.objects.select_related('author', 'group')
-    page_obj = get_page(post_list, request)
+    page_obj = with_reactions(get_page(post_list, request, 'index'))
     context = {
         'page_obj': page_obj,
     }
-    return render(request, 'posts/index.html', context)
+    response = render(request, 'posts/index.html', context)
+    return tag_response(response, 'index', *post_keys(page_obj))
 
 
 def group_posts(request, slug):
     """Страница с постами, выбранной группы."""
-    group = get_object_or_404(Group, slug=slug)
+    group = get_object_or_404(Group.objects.visible(), slug=slug)
     post_list = group.group.all()
-    page_obj = get_page(post_list, request)
+    page_obj = with_reactions(get_page(post_list, request, 'group', group.pk))
     context = {
         'page_obj': page_obj,
         'group': group,
     }
-    return render(request, 'posts/group_list.html', context)
+    response = render(request, 'posts/group_list.html', context)
+    return tag_response(response, f'group:{group.pk}', *post_keys(page_obj))
+
+
+def tag_posts(request, name):
+    """Лента постов с тегом: выборка по индексу (tag, -pub_date)."""
+    tag = get_object_or_404(Tag, name=name.lower())
+    post_list = Post.objects.filter(post_tags__tag=tag).select_related(
+        'author', 'group'
+    ).order_by('-post_tags__pub_date')
+    page_obj = with_reactions(
+        get_page(post_list, request, count=tag.posts_count)
+    )
+    context = {
+        'page_obj': page_obj,
+        'tag': tag,
+    }
+    response = render(request, 'posts/tag_posts.html', context)
+    return tag_response(response, f'tag:{tag.pk}', *post_keys(page_obj))
+
+
+def group_index(request):
+    """Каталог групп со сводкой по каждой."""
+    summary_list = GroupSummary.objects.filter(
+        group__deleted_at__isnull=True
+    ).select_related(
+        'group', 'latest_post', 'latest_post__author'
+    ).order_by(F('last_activity').desc(nulls_last=True), 'group_id')
+    page_obj = get_page(summary_list, request, 'groups')
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/groups.html', context)
 
 
 def profile(request, username):
     """Страница профайла пользователя."""
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    posts_count = post_list.count()
-    page_obj = get_page(post_list, request)
-    following = (
-        request.user.is_authenticated
-        and Follow.objects.filter(
-            user=request.user,
-            author=author
-        ).exists()
-    )
+    author = get_profile_author(username, request.user)
+    posts_count = author.hot_posts_count + author.archived_posts_count
+    post_list = AuthorPosts(author, hot_count=author.hot_posts_count)
+    page_obj = with_reactions(get_page(post_list, request, count=posts_count))
     context = {
         'author': author,
         'posts_count': posts_count,
         'page_obj': page_obj,
-        'following': following,
+        'following': author.is_followed,
     }
-    return render(request, 'posts/profile.html', context)
+    response = render(request, 'posts/profile.html', context)
+    return tag_response(
+        response, f'author:{author.pk}', *post_keys(page_obj)
+    )
 
 
 def post_detail(request, post_id):
     """Страница для просмотра отдельного поста."""
-    post = get_object_or_404(Post.objects.select_related('author'), pk=post_id)
-    comments = Comment.objects.filter(post=post)
-    posts_count = post.author.posts.count()
-    comment_count = comments.count()
-    form = CommentForm(request.POST or None)
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=post_id
+    ).first()
+    if post is None:
+        return archived_post_detail(request, post_id)
+    comments = attach_counts(
+        Comment.objects.filter(post=post).select_related(
+            'author'
+        ).order_by('path'),
+        Reaction.COMMENT
+    )
+    attach_counts([post], Reaction.POST)
+    posts_count = post.author.posts.count() if post.author else 0
+    comment_count = len(comments)
     context = {
         'post': post,
         'posts_count': posts_count,
-        'form': form,
         'comments': comments,
         'comment_count': comment_count,
     }
-    return render(request, 'posts/post_detail.html', context)
+    response = render(request, 'posts/post_detail.html', context)
+    return tag_response(
+        response, f'post:{post.pk}', f'author:{post.author_id}'
+    )
+
+
+def archived_post_detail(request, post_id):
+    """Пост, перенесённый в архив: только чтение."""
+    post = get_object_or_404(
+        ArchivedPost.objects.select_related('author', 'group'), pk=post_id
+    )
+    comments = attach_counts(
+        post.comments.select_related('author').order_by('path'),
+        Reaction.COMMENT
+    )
+    attach_counts([post], Reaction.POST)
+    context = {
+        'post': post,
+        'posts_count': (
+            post.author.posts.count() + post.author.archived_posts.count()
+            if post.author else 0
+        ),
+        'comments': comments,
+        'comment_count': len(comments),
+        'is_archived': True,
+    }
+    response = render(request, 'posts/post_detail.html', context)
+    return tag_response(
+        response, f'post:{post.pk}', f'author:{post.author_id}'
+    )
 
 
 @login_required
@@ -78,6 +168,7 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         form.save()
+        schedule_post_processing(post)
         return redirect('posts:profile', username=post.author)
     form = PostForm()
     return render(request, 'posts/create_post.html', {'form': form})
@@ -99,6 +190,7 @@ def post_edit(request, post_id):
             post = form.save(commit=False)
             post.author = request.user
             form.save()
+            schedule_post_processing(post)
             return redirect('posts:post_detail', post_id)
     return render(
         request,
@@ -116,16 +208,42 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
+        if comment.parent is not None and comment.parent.post_id != post.id:
+            comment.parent = None
         comment.save()
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@login_required
+def react(request, post_id):
+    """Поставить или снять реакцию на пост."""
+    post = get_object_or_404(Post, id=post_id)
+    kind = request.POST.get('kind')
+    if request.method == 'POST' and kind in KIND_LABELS:
+        toggle(request.user, Reaction.POST, post.pk, kind)
+        purge(f'post:{post.pk}')
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+def react_comment(request, post_id, comment_id):
+    """Поставить или снять реакцию на комментарий."""
+    comment = get_object_or_404(Comment, id=comment_id, post_id=post_id)
+    kind = request.POST.get('kind')
+    if request.method == 'POST' and kind in KIND_LABELS:
+        toggle(request.user, Reaction.COMMENT, comment.pk, kind)
+        purge(f'post:{post_id}')
+    return redirect('posts:post_detail', post_id=post_id)
+
+
 @login_required
 def follow_index(request):
     """Старница с постами авторов, на которых подписан текущий пользователь."""
     template_name = 'posts/follow.html'
     post_list = Post.objects.filter(author__following__user=request.user).all()
-    page_obj = get_page(post_list, request)
+    page_obj = with_reactions(
+        get_page(post_list, request, 'follow', request.user.pk)
+    )
     context = {
         'following': True,
         'page_obj': page_obj,
@@ -136,7 +254,7 @@ def follow_index(request):
 @login_required
 def profile_follow(request, username):
     """Подписаться на автора."""
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(User, username=username, is_active=True)
     if request.user != author:
         Follow.objects.get_or_create(user=request.user, author=author)
     return redirect('posts:profile', username=username)
@@ -148,3 +266,18 @@ def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:profile', username=username)
+
+
+@login_required
+def notifications(request):
+    """Входящие уведомления; открытие страницы отмечает их прочитанными."""
+    notification_list = Notification.objects.filter(
+        recipient=request.user
+    ).select_related('actor', 'post')
+    page_obj = get_page(notification_list, request)
+    page_obj.object_list = list(page_obj.object_list)
+    mark_read(request.user)
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/notifications.html', context)
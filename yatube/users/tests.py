@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+
+User = get_user_model()
+
+
+class CachedAuthTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_session_and_user_served_from_cache(self):
+        """Повторный запрос не читает ни сессию, ни пользователя из БД."""
+        url = reverse('about:author')
+        self.authorized_client.get(url)
+        # Остаётся только счётчик непрочитанных уведомлений в шапке.
+        with self.assertNumQueries(1):
+            response = self.authorized_client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_cache_invalidated_on_save(self):
+        """Изменённый пользователь не остаётся в кеше."""
+        url = reverse('about:author')
+        self.authorized_client.get(url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.authorized_client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_sessions_of_model_backend_kept(self):
+        """Сессии, созданные до кеширующего бэкенда, остаются рабочими."""
+        client = Client()
+        client.force_login(
+            self.user, backend='django.contrib.auth.backends.ModelBackend'
+        )
+        response = client.get(reverse('about:author'))
+        self.assertEqual(response.context['user'], self.user)
+
+
+class ProductionSettingsTests(TestCase):
+    def test_shared_cache_required(self):
+        """Продакшен не запускается с кешем внутри процесса."""
+        env = dict(
+            os.environ,
+            SECRET_KEY='secret',
+            ALLOWED_HOSTS='example.com',
+            CACHE_BACKEND='django.core.cache.backends.locmem.LocMemCache',
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', 'import yatube.settings.prod'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('CACHE_BACKEND', result.stderr)
+
+
+class PurgeSessionsTests(TestCase):
+    def test_expired_sessions_purged(self):
+        """Удаляются только истёкшие сессии."""
+        for _ in range(3):
+            store = SessionStore()
+            store.create()
+        Session.objects.update(expire_date=timezone.now() - timedelta(days=1))
+        alive = SessionStore()
+        alive.create()
+        call_command('purge_sessions', batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            [alive.session_key]
+        )
@@ -0,0 +1,24 @@
+"""
+Django settings for yatube project.
+
+The profile is chosen by the DJANGO_ENV environment variable:
+dev (default), test or prod. `manage.py test` picks test by itself.
+"""
+
+import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENVIRONMENT = os.environ.get('DJANGO_ENV') or (
+    'test' if sys.argv[1:2] == ['test'] else 'dev'
+)
+
+if ENVIRONMENT == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif ENVIRONMENT == 'test':
+    from .test import *  # noqa: F401,F403
+elif ENVIRONMENT == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f'Unknown DJANGO_ENV: {ENVIRONMENT}')
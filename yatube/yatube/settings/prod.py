@@ -0,0 +1,76 @@
+"""Production: everything comes from the environment, no debug tooling."""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('SECRET_KEY must be set in production.')
+
+ALLOWED_HOSTS = [
+    host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host
+]
+if not ALLOWED_HOSTS:
+    raise ImproperlyConfigured('ALLOWED_HOSTS must be set in production.')
+
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+STATIC_ROOT = os.environ.get(
+    'STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles')
+)
+
+SESSION_COOKIE_SECURE = os.environ.get('SECURE_COOKIES', '1') == '1'
+CSRF_COOKIE_SECURE = SESSION_COOKIE_SECURE
+
+# Sessions, the cached user, page cache purges and feed counts must be
+# seen by every worker and by runjobs, so a per-process cache won't do.
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'core.instrumentation.InstrumentedLocMemCache',
+)
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', '')
+if not CACHE_BACKEND or CACHE_BACKEND in LOCAL_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        'CACHE_BACKEND must be set to a shared cache in production.'
+    )
+CACHES = {
+    'default': {
+        'BACKEND': 'core.instrumentation.InstrumentedCache',
+        'WRAPPED': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+METRICS_DIR = os.environ.get('METRICS_DIR', '/tmp/yatube-metrics')
+PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', '0'))
+
+MEDIA_OFFLOAD = os.environ.get('MEDIA_OFFLOAD') or None
+
+MAIL_SPOOL_DIR = os.environ.get('MAIL_SPOOL_DIR', '/var/spool/yatube-mail')
+MAIL_SPOOL_BACKEND = os.environ.get(
+    'MAIL_SPOOL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend'
+)
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '0') == '1'
+
+SITEMAP_DIR = os.environ.get(
+    'SITEMAP_DIR', os.path.join(BASE_DIR, 'sitemaps')
+)
+SITEMAP_BASE_URL = os.environ.get(
+    'SITEMAP_BASE_URL', f'https://{ALLOWED_HOSTS[0]}'
+)
@@ -0,0 +1,13 @@
+"""Test runs: no debug tooling, fast hashing, mail kept in memory."""
+
+from .base import *  # noqa: F401,F403
+
+DEBUG = False
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+PROFILER_SAMPLE_RATE = 0
+PAGE_CACHE_TIMEOUT = 0
+METRICS_DIR = None